@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, select, func
+from sqlalchemy.exc import ProgrammingError
 from typing import List, Dict, Any
-from ..database import get_db
+from ..database import get_db, get_async_db
+from ..prediction_cache import prediction_cache
 from ..models import Customer, Loan, RefinanceApplication, RefinanceProduct
 from ..schemas import CustomerCreate, CustomerResponse, LoanCreate, LoanResponse, RefinanceApplicationCreate, RefinanceApplicationResponse
 
@@ -17,37 +20,56 @@ def get_main_info():
         "status": "running"
     }
 
+async def _count_dashboard_data(db: AsyncSession) -> Dict[str, Any]:
+    """카운터 테이블이 없을 때의 직접 집계 (전체 스캔)"""
+    customer_count = await db.scalar(select(func.count()).select_from(Customer))
+    loan_count = await db.scalar(select(func.count()).select_from(Loan))
+    refinance_count = await db.scalar(select(func.count()).select_from(RefinanceApplication))
+    product_count = await db.scalar(
+        select(func.count()).select_from(RefinanceProduct).where(RefinanceProduct.is_active == True)
+    )
+    total_loan_amount = await db.scalar(select(func.coalesce(func.sum(Loan.loan_amount), 0)))
+    return {
+        "customer_count": customer_count,
+        "loan_count": loan_count,
+        "refinance_count": refinance_count,
+        "product_count": product_count,
+        "total_loan_amount": total_loan_amount,
+    }
+
 @router.get("/dashboard")
-def get_dashboard_data(db: Session = Depends(get_db)):
-    """대시보드 데이터 조회"""
+async def get_dashboard_data(db: AsyncSession = Depends(get_async_db)):
+    """대시보드 데이터 조회 (트리거로 유지되는 dashboard_counters 단일 행 조회)"""
     try:
-        # 고객 수
-        customer_count = db.query(Customer).count()
-        
-        # 대출 수
-        loan_count = db.query(Loan).count()
-        
-        # 재대출 신청 수
-        refinance_count = db.query(RefinanceApplication).count()
-        
-        # 상품 수
-        product_count = db.query(RefinanceProduct).filter(RefinanceProduct.is_active == True).count()
+        try:
+            result = await db.execute(text("""
+                SELECT customer_count, loan_count, refinance_count, product_count, total_loan_amount
+                FROM dashboard_counters
+                WHERE id = 1
+            """))
+            counters = result.mappings().first()
+        except ProgrammingError:
+            # 카운터 테이블 미생성(init.sql 미적용) 환경
+            await db.rollback()
+            counters = None
+        if counters is None:
+            counters = await _count_dashboard_data(db)
         
         return {
-            "customer_count": customer_count,
-            "loan_count": loan_count,
-            "refinance_count": refinance_count,
-            "product_count": product_count,
-            "total_assets": loan_count * 50000000  # 예시 데이터
+            "customer_count": int(counters["customer_count"]),
+            "loan_count": int(counters["loan_count"]),
+            "refinance_count": int(counters["refinance_count"]),
+            "product_count": int(counters["product_count"]),
+            "total_assets": float(counters["total_loan_amount"] or 0)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"대시보드 데이터 조회 실패: {str(e)}")
 
 @router.get("/customers", response_model=List[CustomerResponse])
-def get_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_customers(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
     """고객 목록 조회"""
-    customers = db.query(Customer).offset(skip).limit(limit).all()
-    return customers
+    result = await db.execute(select(Customer).offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.post("/customers", response_model=CustomerResponse)
 def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
@@ -59,10 +81,10 @@ def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
     return db_customer
 
 @router.get("/loans", response_model=List[LoanResponse])
-def get_loans(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_loans(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
     """대출 목록 조회"""
-    loans = db.query(Loan).offset(skip).limit(limit).all()
-    return loans
+    result = await db.execute(select(Loan).offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.post("/loans", response_model=LoanResponse)
 def create_loan(loan: LoanCreate, db: Session = Depends(get_db)):
@@ -71,6 +93,8 @@ def create_loan(loan: LoanCreate, db: Session = Depends(get_db)):
     db.add(db_loan)
     db.commit()
     db.refresh(db_loan)
+    # 대출 변경 → 해당 고객의 예측 캐시 무효화
+    prediction_cache.invalidate_customer(db_loan.customer_id)
     return db_loan
 
 @router.get("/refinance-applications", response_model=List[RefinanceApplicationResponse])
@@ -119,7 +143,7 @@ def get_recommendations(customer_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"추천 데이터 조회 실패: {str(e)}")
 
 @router.get("/ml_dashboard")
-def get_ml_predictions(db: Session = Depends(get_db)):
+async def get_ml_predictions(db: AsyncSession = Depends(get_async_db)):
     """ML 예측 데이터 조회 (customers 스키마 기반)"""
     try:
         # customers 스키마의 데이터를 조합하여 ML 예측 데이터 형태로 변환
@@ -166,9 +190,10 @@ def get_ml_predictions(db: Session = Depends(get_db)):
                     WHEN c.income_level = '7000만원 이상' THEN 0.8
                     ELSE 0.5
                 END as debt_to_income_ratio,
-                FLOOR(RANDOM() * 20 + 1) as employment_length_years,
-                FLOOR(RANDOM() * 10 + 1) as number_of_accounts,
-                FLOOR(RANDOM() * 5) as inquiries_last_6m,
+                -- 원천 컬럼이 없는 피처는 customer_id 해시로 결정적으로 생성 (같은 고객은 항상 같은 값)
+                MOD(ABS(hashtext(c.customer_id || ':employment')::bigint), 20) + 1 as employment_length_years,
+                MOD(ABS(hashtext(c.customer_id || ':accounts')::bigint), 10) + 1 as number_of_accounts,
+                MOD(ABS(hashtext(c.customer_id || ':inquiries')::bigint), 5) as inquiries_last_6m,
                 CASE 
                     WHEN l.status = '연체' THEN 1
                     WHEN l.overdue_days > 0 THEN 1
@@ -181,7 +206,7 @@ def get_ml_predictions(db: Session = Depends(get_db)):
             LIMIT 1000
         """)
         
-        result = db.execute(query)
+        result = await db.execute(query)
         data = []
         
         for row in result:
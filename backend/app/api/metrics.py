@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from ..database import POOL_METRICS, POOL_KWARGS, STATEMENT_TIMEOUT_MS
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/db-pool")
+async def get_db_pool_metrics():
+    """커넥션 풀 상태 (체크아웃 수, 대기시간, 오버플로/타임아웃 이벤트)"""
+    return {
+        "config": {**POOL_KWARGS, "statement_timeout_ms": STATEMENT_TIMEOUT_MS},
+        "pools": {name: metrics.snapshot() for name, metrics in POOL_METRICS.items()},
+    }
@@ -0,0 +1,103 @@
+import os
+import secrets
+from fastapi import APIRouter, HTTPException, Depends, Header
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Optional
+from ..database import get_db
+from ..schemas import PredictRequest, PredictResponse, ExplanationResponse
+from ..scoring import scorer
+from ..prediction_cache import change_invalidator, prediction_cache, fingerprint
+
+router = APIRouter(prefix="/predict", tags=["predict"])
+
+# 운영 모델 교체 등 관리용 엔드포인트 토큰 (미설정 시 관리 엔드포인트 비활성화)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """X-Admin-Token 헤더 검증"""
+    if ADMIN_TOKEN is None:
+        raise HTTPException(status_code=403, detail="관리 엔드포인트가 비활성화되어 있습니다 (ADMIN_TOKEN 미설정).")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다.")
+
+@router.post("", response_model=PredictResponse)
+async def predict(request: PredictRequest, threshold: float = 0.5):
+    """고객 1명의 이탈 확률 예측 (캐시 미스만 스코어링, 동시 요청은 마이크로 배치로 묶어 처리)"""
+    active = scorer.registry.active()
+    if active is None:
+        raise HTTPException(status_code=503, detail="예측 모델이 아직 로드되지 않았습니다.")
+    features = request.model_dump()
+    proba = prediction_cache.get(fingerprint(active.version, features))
+    cached = proba is not None
+    model_version = active.version
+    if not cached:
+        try:
+            proba, model_version = await scorer.predict(features)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"예측 실패: {str(e)}")
+        prediction_cache.put(fingerprint(model_version, features), request.customer_id, proba)
+    return PredictResponse(
+        customer_id=request.customer_id,
+        churn_probability=round(proba, 4),
+        churn_prediction=proba >= threshold,
+        confidence_score=round(max(proba, 1 - proba), 4),
+        model_version=model_version,
+        cached=cached,
+    )
+
+@router.get("/metrics")
+def get_predict_metrics():
+    """예측 지연시간(p50/p99), 배치 크기, 캐시 적중 통계"""
+    return {**scorer.metrics(), "cache": {**prediction_cache.metrics(), "change_feed": change_invalidator.status()}}
+
+@router.get("/model")
+def get_active_model():
+    """활성 모델 버전 및 레지스트리 상태"""
+    return scorer.registry.status()
+
+@router.post("/model/promote", dependencies=[Depends(require_admin)])
+def promote_shadow_model():
+    """섀도 모델을 운영 모델로 승격"""
+    version = scorer.registry.promote()
+    if version is None:
+        raise HTTPException(status_code=404, detail="섀도 모델이 없습니다.")
+    return {"active_version": version}
+
+@router.delete("/cache/{customer_id}")
+def invalidate_customer_cache(customer_id: str):
+    """고객 예측 캐시 무효화 (백엔드 밖에서 대출/상환이 변경된 경우)"""
+    return {"customer_id": customer_id, "invalidated": prediction_cache.invalidate_customer(customer_id)}
+
+@router.get("/explanations/{customer_id}", response_model=ExplanationResponse)
+def get_explanation(customer_id: str, model_version: Optional[str] = None, db: Session = Depends(get_db)):
+    """배치 스코어링에서 미리 계산한 고객별 상위 기여 피처 조회 (PK 인덱스 조회 1회, 기본은 운영 모델 버전)"""
+    if model_version is None:
+        active = scorer.registry.active()
+        # 운영 모델이 아직 없으면 가장 최근 설명
+        model_version = active.version if active is not None else None
+    row = db.execute(text("""
+        SELECT e.customer_id, e.model_version, e.base_value, e.top_features, e.contributions, e.created_at,
+               p.churn_probability
+        FROM ml.ml_prediction_explanations e
+        LEFT JOIN ml.ml_predictions p
+            ON p.customer_id = e.customer_id AND p.model_version = e.model_version
+        WHERE e.customer_id = :customer_id
+        AND (CAST(:model_version AS VARCHAR) IS NULL OR e.model_version = :model_version)
+        ORDER BY e.created_at DESC
+        LIMIT 1
+    """), {"customer_id": customer_id, "model_version": model_version}).mappings().first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="해당 고객의 설명 데이터가 없습니다.")
+    return ExplanationResponse(
+        customer_id=row["customer_id"],
+        model_version=row["model_version"],
+        churn_probability=float(row["churn_probability"]) if row["churn_probability"] is not None else None,
+        base_value=row["base_value"],
+        contributions=[
+            {"feature": f, "contribution": c}
+            for f, c in zip(row["top_features"] or [], row["contributions"] or [])
+        ],
+        created_at=row["created_at"],
+    )
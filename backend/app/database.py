@@ -2,8 +2,11 @@ import os
 from dotenv import load_dotenv
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from .db_metrics import PoolMetrics, TimedAsyncQueuePool, TimedQueuePool
+
 load_dotenv()
 
 # 데이터베이스 URL 설정
@@ -17,25 +20,74 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL이 안들어왔엉요")
 
-# 비동기 asynccpg 드라이버 사용
-#if DATABASE_URL.startswith("postgresql://"):
-#    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+# 비동기 asyncpg 드라이버 URL (동기 URL의 드라이버만 교체)
+def to_async_url(url: str) -> str:
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+# 커넥션 풀 설정 (워커 수에 맞게 조정)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+# 쿼리 제한 시간(ms, 0이면 서버 기본값)
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+POOL_KWARGS = {
+    "pool_size": POOL_SIZE,
+    "max_overflow": MAX_OVERFLOW,
+    "pool_timeout": POOL_TIMEOUT,
+    "pool_recycle": POOL_RECYCLE,
+    "pool_pre_ping": POOL_PRE_PING,
+}
+SYNC_CONNECT_ARGS = {"options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"} if STATEMENT_TIMEOUT_MS else {}
+ASYNC_CONNECT_ARGS = {"server_settings": {"statement_timeout": str(STATEMENT_TIMEOUT_MS)}} if STATEMENT_TIMEOUT_MS else {}
 
-# engine : sqlalchemy CREATE Engine (비동기)
+# engine : sqlalchemy CREATE Engine (동기 - 테이블 생성, 쓰기 라우트, 백그라운드 스레드용)
 engine = create_engine(
-    DATABASE_URL
+    DATABASE_URL,
+    poolclass=TimedQueuePool,
+    connect_args=SYNC_CONNECT_ARGS,
+    **POOL_KWARGS
 )
 
+# async_engine : 읽기 위주 핫 경로(async def 라우트)용 비동기 엔진
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
+    connect_args=ASYNC_CONNECT_ARGS,
+    **POOL_KWARGS
+)
+
+# 풀 이벤트 기반 통계 (/api/metrics/db-pool)
+POOL_METRICS = {
+    "sync": PoolMetrics("sync").attach(engine.pool),
+    "async": PoolMetrics("async").attach(async_engine.sync_engine.pool),
+}
+
 # ORM 모델 상속 - SQLAlchemy 2.0 호환
 Base = declarative_base()
 
-# Async 세션 팩토리 생성
+# 동기 세션 팩토리 생성
 SessionLocal = sessionmaker(
     bind=engine, 
     autoflush=False, 
     expire_on_commit=False
 )
 
+# Async 세션 팩토리 생성
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # 데이터베이스 세션 의존성
 def get_db():
     db = SessionLocal()
@@ -44,5 +96,10 @@ def get_db():
     finally:
         db.close()
 
+# 비동기 데이터베이스 세션 의존성
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 
 
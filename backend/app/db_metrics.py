@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """커넥션 풀 이벤트 기반 통계 (체크아웃 대기시간, 오버플로, 타임아웃, 무효화)"""
+
+    def __init__(self, name: str, maxlen: int = 5000):
+        self.name = name
+        self.pool = None
+        self._waits = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.overflow_connects = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.max_checked_out = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self._waits.append(seconds * 1000.0)
+            if timed_out:
+                self.timeouts += 1
+
+    def attach(self, pool):
+        """풀 이벤트 리스너 등록"""
+        self.pool = pool
+        pool._metrics = self
+
+        @event.listens_for(pool, "connect")
+        def on_connect(dbapi_conn, record):
+            with self._lock:
+                self.connects += 1
+                if self.pool.overflow() > 0:
+                    self.overflow_connects += 1
+
+        @event.listens_for(pool, "checkout")
+        def on_checkout(dbapi_conn, record, proxy):
+            checked_out = self.pool.checkedout()
+            with self._lock:
+                self.checkouts += 1
+                self.max_checked_out = max(self.max_checked_out, checked_out)
+                if self.pool.overflow() > 0:
+                    self.overflow_checkouts += 1
+
+        @event.listens_for(pool, "checkin")
+        def on_checkin(dbapi_conn, record):
+            with self._lock:
+                self.checkins += 1
+
+        @event.listens_for(pool, "invalidate")
+        def on_invalidate(dbapi_conn, record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+        return self
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "overflow_connects": self.overflow_connects,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "max_checked_out": self.max_checked_out,
+            }
+
+        def pct(q):
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))], 3) if waits else None
+
+        pool = self.pool
+        return {
+            "name": self.name,
+            "size": pool.size() if pool is not None else None,
+            "checked_out": pool.checkedout() if pool is not None else None,
+            "checked_in": pool.checkedin() if pool is not None else None,
+            "overflow": pool.overflow() if pool is not None else None,
+            "wait_ms": {"p50": pct(0.5), "p99": pct(0.99), "max": waits[-1] if waits else None, "samples": len(waits)},
+            **stats,
+        }
+
+
+class _TimedPoolMixin:
+    """체크아웃 대기시간 측정 (풀에 커넥션이 없을 때 기다린 시간 포함)"""
+
+    def _do_get(self):
+        metrics = getattr(self, "_metrics", None)
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            if metrics is not None:
+                metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if metrics is not None:
+            metrics.record_wait(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        # 풀 재생성(dispose 등) 시 리스너는 새 풀로 이어지므로 통계 대상만 교체
+        new_pool = super().recreate()
+        metrics = getattr(self, "_metrics", None)
+        if metrics is not None:
+            new_pool._metrics = metrics
+            metrics.pool = new_pool
+        return new_pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
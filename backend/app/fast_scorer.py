@@ -0,0 +1,64 @@
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# churn-ga-xgb/fast_scorer.py 가 저장하는 아티팩트 형식 버전 (두 구현은 같은 형식을 읽어야 함)
+FAST_SCORER_VERSION = 1
+
+
+class FastScorer:
+    """
+    학습 측 export_fast_scorer() 아티팩트(전처리 통계 NumPy 배열 + Booster 원본)로 확률 계산
+    - sklearn ColumnTransformer 대신 fused NumPy 변환 + Booster.inplace_predict
+    """
+
+    def __init__(self, artifact: dict):
+        self.num_cols = artifact["num_cols"]
+        self.cat_cols = artifact["cat_cols"]
+        self.n_features = artifact["n_features"]
+        self._num_fill = artifact["num_fill"]
+        # 표준화를 x * inv_scale + offset 한 번으로 결합
+        self._inv_scale = 1.0 / artifact["num_scale"]
+        self._offset = -artifact["num_mean"] * self._inv_scale
+        self._cat_fill = artifact["cat_fill"]
+        self._cat_categories = [pd.Index(c) for c in artifact["cat_categories"]]
+        self._cat_offsets = np.cumsum([len(self.num_cols)] + [len(c) for c in self._cat_categories])[:-1]
+        self.booster = xgb.Booster()
+        self.booster.load_model(bytearray(artifact["booster_raw"]))
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """ColumnTransformer.transform 과 동일한 float32 행렬"""
+        n = len(df)
+        out = np.zeros((n, self.n_features), dtype=np.float32)
+        if self.num_cols:
+            Xn = df[self.num_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+            mask = np.isnan(Xn)
+            if mask.any():
+                Xn = np.where(mask, self._num_fill, Xn)
+            out[:, :len(self.num_cols)] = Xn * self._inv_scale + self._offset
+        rows = np.arange(n)
+        for col, fill, cats, offset in zip(self.cat_cols, self._cat_fill, self._cat_categories, self._cat_offsets):
+            values = df[col]
+            if values.isna().any():
+                values = values.fillna(fill)
+            codes = cats.get_indexer(values)
+            # handle_unknown='ignore' 와 동일하게 미지 범주는 전부 0
+            known = codes >= 0
+            out[rows[known], offset + codes[known]] = 1.0
+        return out
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """양성 클래스(1) 확률"""
+        return self.booster.inplace_predict(self.transform(df), predict_type="value")
+
+
+def load_fast_scorer(path: str, nthread: int = 0) -> FastScorer:
+    """저장된 고속 스코어러 아티팩트 로드"""
+    artifact = joblib.load(path)
+    if artifact.get("version") != FAST_SCORER_VERSION:
+        raise ValueError(f"지원하지 않는 고속 스코어러 버전: {artifact.get('version')}")
+    scorer = FastScorer(artifact)
+    if nthread:
+        scorer.booster.set_param({"nthread": nthread})
+    return scorer
@@ -5,9 +5,11 @@ import logging
 import os
 
 from .logging import setup_logging
-from .database import engine
+from .database import engine, async_engine
 from .models import Base
 from .api.router import api_router
+from .scoring import scorer
+from .prediction_cache import change_invalidator
 
 
 # 환경 : 항상 개발환경 가정
@@ -44,6 +46,18 @@ app.add_middleware(
 # API 라우터
 app.include_router(api_router, prefix="/api")
 
+# 예측 모델은 시작 시 한 번만 로드
+@app.on_event("startup")
+async def start_scorer():
+    await scorer.start()
+    await change_invalidator.start()
+
+@app.on_event("shutdown")
+async def stop_scorer():
+    await change_invalidator.stop()
+    await scorer.stop()
+    await async_engine.dispose()
+
 # 예외 처리
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import joblib
+from sqlalchemy import text
+
+from .database import SessionLocal
+from .fast_scorer import load_fast_scorer
+
+logger = logging.getLogger(__name__)
+
+# DB 기록이 없을 때 사용할 기본 모델 경로 (ml-service 의 outputs 볼륨을 공유)
+MODEL_PATH = os.getenv("MODEL_PATH", "/app/outputs/model_pipeline.joblib")
+# model_path 가 상대 경로일 때 기준 디렉토리 (ml-service 는 /app 에서 outputs/ 로 저장)
+MODEL_ROOT = os.getenv("MODEL_ROOT", "/app")
+# 메모리에 유지할 모델 버전 수 / 새 버전 확인 주기(초)
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "3"))
+MODEL_POLL_SECONDS = float(os.getenv("MODEL_POLL_SECONDS", "30"))
+# 새 버전 반영 방식: auto(즉시 교체) / shadow(섀도 모델로만 로드, 승격은 수동)
+MODEL_ROLLOUT = os.getenv("MODEL_ROLLOUT", "auto")
+# 특정 버전을 섀도 모델로 고정 (선택)
+SHADOW_MODEL_VERSION = os.getenv("SHADOW_MODEL_VERSION") or None
+
+# 고속 스코어러 사용 여부 (끄면 항상 sklearn 파이프라인으로 예측)
+USE_FAST_SCORER = os.getenv("USE_FAST_SCORER", "True").lower() == "true"
+
+
+class ActiveModel(namedtuple("ActiveModel", ["version", "path", "pipeline", "feature_names", "fast_scorer"])):
+    """로드된 모델 (고속 스코어러가 있으면 예측에 사용, 없으면 파이프라인)"""
+    __slots__ = ()
+
+    def predict_proba(self, df):
+        """양성 클래스(1) 확률"""
+        if self.fast_scorer is not None:
+            return self.fast_scorer.predict_proba(df)
+        return self.pipeline.predict_proba(df)[:, 1]
+
+
+class ModelRegistry:
+    """
+    ml.ml_model_performance 기반 모델 레지스트리
+    - 최신 model_version / model_path 를 주기적으로 확인
+    - 새 버전은 백그라운드 스레드에서 로드한 뒤 활성 모델을 한 번에 교체 → 요청 경로에서 로드하지 않음
+    - 로드한 파이프라인은 버전별 LRU 로 보관
+    - rollout=shadow 이면 새 버전은 섀도 모델로만 로드 → promote() 로 승격
+    """
+
+    def __init__(self, fallback_path: str = MODEL_PATH, cache_size: int = MODEL_CACHE_SIZE,
+                 poll_seconds: float = MODEL_POLL_SECONDS, rollout: str = MODEL_ROLLOUT,
+                 shadow_version: Optional[str] = SHADOW_MODEL_VERSION):
+        self.fallback_path = fallback_path
+        self.cache_size = max(2, cache_size)
+        self.poll_seconds = poll_seconds
+        self.rollout = rollout
+        self.shadow_version = shadow_version
+        self._cache: "OrderedDict[str, ActiveModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._active: Optional[ActiveModel] = None
+        self._shadow: Optional[ActiveModel] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_checked: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def active(self) -> Optional[ActiveModel]:
+        """현재 활성 모델 (참조 한 번으로 읽으므로 교체 중에도 일관된 스냅샷)"""
+        return self._active
+
+    def shadow(self) -> Optional[ActiveModel]:
+        """현재 섀도(후보) 모델"""
+        return self._shadow
+
+    def get(self, version: str) -> Optional[ActiveModel]:
+        """이미 로드된 버전만 반환 (요청 경로에서 로드하지 않음)"""
+        with self._lock:
+            model = self._cache.get(version)
+            if model is not None:
+                self._cache.move_to_end(version)
+            return model
+
+    def _resolve_path(self, path: str) -> str:
+        return path if os.path.isabs(path) else os.path.join(MODEL_ROOT, path)
+
+    def _latest_row(self):
+        db = SessionLocal()
+        try:
+            return db.execute(text("""
+                SELECT model_version, model_path, manifest_path
+                FROM ml.ml_model_performance
+                WHERE model_path IS NOT NULL
+                ORDER BY training_date DESC, id DESC
+                LIMIT 1
+            """)).first()
+        finally:
+            db.close()
+
+    def _version_row(self, version: str):
+        db = SessionLocal()
+        try:
+            return db.execute(text("""
+                SELECT model_version, model_path, manifest_path
+                FROM ml.ml_model_performance
+                WHERE model_version = :version AND model_path IS NOT NULL
+                ORDER BY training_date DESC, id DESC
+                LIMIT 1
+            """), {"version": version}).first()
+        finally:
+            db.close()
+
+    def _fast_scorer_path(self, path: str, manifest_path: Optional[str] = None) -> Optional[str]:
+        """매니페스트의 'Fast Scorer' 항목, 매니페스트가 없으면 모델 옆 fast_scorer.joblib"""
+        if manifest_path:
+            manifest_path = self._resolve_path(manifest_path)
+            if os.path.exists(manifest_path):
+                with open(manifest_path, encoding="utf-8") as fp:
+                    entry = json.load(fp).get("artifacts", {}).get("Fast Scorer")
+                return self._resolve_path(entry["path"]) if entry else None
+        sibling = os.path.join(os.path.dirname(path), "fast_scorer.joblib")
+        return sibling if os.path.exists(sibling) else None
+
+    def _load(self, version: str, path: str, manifest_path: Optional[str] = None) -> ActiveModel:
+        cached = self.get(version)
+        if cached is not None:
+            return cached
+        pipeline = joblib.load(path)
+        fast_scorer = None
+        if USE_FAST_SCORER:
+            try:
+                fast_path = self._fast_scorer_path(path, manifest_path)
+                fast_scorer = load_fast_scorer(fast_path) if fast_path else None
+            except Exception as e:
+                logger.warning(f"고속 스코어러 로드 실패, 파이프라인으로 예측합니다 ({version}): {str(e)}")
+        model = ActiveModel(version, path, pipeline, list(getattr(pipeline, "feature_names_in_", [])), fast_scorer)
+        with self._lock:
+            self._cache[version] = model
+            self._cache.move_to_end(version)
+            while len(self._cache) > self.cache_size:
+                oldest = next(iter(self._cache))
+                pinned = {m.version for m in (self._active, self._shadow) if m is not None}
+                if oldest in pinned:
+                    self._cache.move_to_end(oldest)
+                    continue
+                self._cache.pop(oldest)
+        logger.info(f"모델 로드 완료: version={version}, path={path}, fast_scorer={fast_scorer is not None}")
+        return model
+
+    def refresh(self) -> bool:
+        """최신 버전 확인 후 필요하면 로드·교체 (블로킹, 백그라운드 스레드에서 호출). 교체 여부 반환"""
+        self.last_checked = datetime.now()
+        try:
+            row = self._latest_row()
+        except Exception as e:
+            row = None
+            self.last_error = f"레지스트리 조회 실패: {str(e)}"
+            logger.warning(self.last_error)
+
+        manifest_path = None
+        if row is not None:
+            version, path, manifest_path = row[0], self._resolve_path(row[1]), row[2]
+        else:
+            fallback = self._fallback()
+            if fallback is None:
+                return False
+            version, path = fallback
+
+        if self.shadow_version:
+            self._refresh_pinned_shadow()
+
+        if self._active is not None and self._active.version == version:
+            return False
+        if self._active is not None and self.rollout == "shadow":
+            # 활성 모델은 유지하고 새 버전은 섀도로만 로드
+            if not self.shadow_version and (self._shadow is None or self._shadow.version != version):
+                model = self._try_load(version, path, manifest_path)
+                if model is not None:
+                    with self._lock:
+                        self._shadow = model
+                    logger.info(f"섀도 모델 로드: {version} (활성 {self._active.version})")
+            return False
+        model = self._try_load(version, path, manifest_path)
+        if model is None and row is not None:
+            # DB 기록의 모델을 읽지 못하고 활성 모델도 없으면 MODEL_PATH 로 대체 (다음 주기에 DB 기록 재시도)
+            error = self.last_error
+            fallback = self._fallback()
+            if fallback is not None:
+                model = self._try_load(*fallback)
+                if model is not None:
+                    self.last_error = error
+                    logger.warning(f"DB 기록 모델 대신 기본 모델 사용: {model.version}")
+        if model is None:
+            return False
+        with self._lock:
+            previous = self._active
+            self._active = model
+            if self._shadow is not None and self._shadow.version == model.version:
+                self._shadow = None
+        logger.info(f"활성 모델 교체: {previous.version if previous else None} → {model.version}")
+        return True
+
+    def _fallback(self):
+        """활성 모델이 없을 때 사용할 MODEL_PATH 의 (버전, 경로)"""
+        if self._active is not None or not os.path.exists(self.fallback_path):
+            return None
+        version = "file_" + datetime.fromtimestamp(os.path.getmtime(self.fallback_path)).strftime("%Y%m%d_%H%M%S")
+        return version, self.fallback_path
+
+    def _try_load(self, version: str, path: str, manifest_path: Optional[str] = None) -> Optional[ActiveModel]:
+        try:
+            model = self._load(version, path, manifest_path)
+        except Exception as e:
+            self.last_error = f"모델 로드 실패 ({version}): {str(e)}"
+            logger.error(self.last_error)
+            return None
+        self.last_error = None
+        return model
+
+    def _refresh_pinned_shadow(self):
+        """SHADOW_MODEL_VERSION 으로 지정된 버전을 섀도 모델로 로드"""
+        if self._shadow is not None and self._shadow.version == self.shadow_version:
+            return
+        if self._active is not None and self._active.version == self.shadow_version:
+            return
+        try:
+            row = self._version_row(self.shadow_version)
+        except Exception as e:
+            self.last_error = f"섀도 모델 조회 실패: {str(e)}"
+            logger.warning(self.last_error)
+            return
+        if row is not None:
+            model = self._try_load(row[0], self._resolve_path(row[1]), row[2])
+            if model is not None:
+                with self._lock:
+                    self._shadow = model
+
+    def promote(self) -> Optional[str]:
+        """섀도 모델을 활성 모델로 승격, 승격된 버전 반환"""
+        with self._lock:
+            shadow = self._shadow
+            if shadow is None:
+                return None
+            previous = self._active
+            self._active = shadow
+            self._shadow = None
+            self.shadow_version = None
+        logger.info(f"섀도 모델 승격: {previous.version if previous else None} → {shadow.version}")
+        return shadow.version
+
+    async def start(self):
+        self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _poll_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self.refresh)
+            await asyncio.sleep(self.poll_seconds)
+
+    def status(self) -> Dict[str, Any]:
+        active = self._active
+        shadow = self._shadow
+        with self._lock:
+            cached = list(self._cache.keys())
+        return {
+            "active_version": active.version if active else None,
+            "active_path": active.path if active else None,
+            "active_fast_scorer": active.fast_scorer is not None if active else None,
+            "shadow_version": shadow.version if shadow else None,
+            "rollout": self.rollout,
+            "cached_versions": cached,
+            "cache_size": self.cache_size,
+            "poll_seconds": self.poll_seconds,
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "last_error": self.last_error,
+        }
+
+
+# 앱 전역 레지스트리
+registry = ModelRegistry()
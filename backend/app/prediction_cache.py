@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 예측 캐시 설정: 유효 시간(초) / 최대 항목 수
+CACHE_TTL_SECONDS = float(os.getenv("PREDICT_CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_SIZE = int(os.getenv("PREDICT_CACHE_MAX_SIZE", "10000"))
+# customers.customer_changes 확인 주기(초), 0 이면 변경 피드 무효화 비활성화
+CACHE_INVALIDATE_POLL_SECONDS = float(os.getenv("PREDICT_CACHE_INVALIDATE_POLL_SECONDS", "5"))
+
+
+def fingerprint(model_version: str, features: Dict[str, Any]) -> str:
+    """모델 버전 + 피처 벡터 해시 (피처 순서와 무관)"""
+    payload = json.dumps(features, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(f"{model_version}|{payload}".encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """
+    TTL + LRU 예측 캐시
+    - 키: fingerprint(model_version, features) → 모델이 바뀌거나 피처가 바뀌면 자동으로 다른 키
+    - customer_id → 키 목록 인덱스로 고객 단위 무효화 (대출/상환 변경 시, ChangeFeedInvalidator)
+    """
+
+    def __init__(self, ttl_seconds: float = CACHE_TTL_SECONDS, max_size: int = CACHE_MAX_SIZE):
+        self.ttl = ttl_seconds
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._by_customer: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _remove(self, key: str):
+        _, _, customer_id = self._entries.pop(key)
+        keys = self._by_customer.get(customer_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_customer[customer_id]
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, customer_id: str, value: Any):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, customer_id)
+            self._by_customer.setdefault(customer_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_customer(self, customer_id: str) -> int:
+        """고객의 캐시 항목 전체 삭제, 삭제 건수 반환"""
+        with self._lock:
+            keys = list(self._by_customer.get(customer_id, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_customer.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class ChangeFeedInvalidator:
+    """
+    customers.customer_changes(대출/상환 변경 트리거가 기록) 를 주기적으로 읽어 해당 고객의 캐시 무효화
+    - 백엔드 API 를 거치지 않는 customers.loans / customers.repayments 변경도 반영
+    - 트랜잭션 id 구간 [last_txid, txid_snapshot_xmin) 만 읽음 → 진행 중인 트랜잭션의 변경은 다음 주기에 반영
+    - 변경 피드가 없으면(스키마 미생성) 다음 주기에 재시도
+    - 배치 스코어링 --prune_changes 가 먼저 삭제한 변경은 놓칠 수 있음 → TTL 로 만료
+    """
+
+    def __init__(self, cache: "PredictionCache", poll_seconds: float = CACHE_INVALIDATE_POLL_SECONDS):
+        self.cache = cache
+        self.poll_seconds = poll_seconds
+        self._last_txid: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_checked: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.customers_invalidated = 0
+
+    def poll(self) -> int:
+        """새 변경의 고객 캐시 무효화 (블로킹, 백그라운드 스레드에서 호출). 무효화한 고객 수 반환"""
+        self.last_checked = datetime.now()
+        db = SessionLocal()
+        try:
+            if db.execute(text("SELECT to_regclass('customers.customer_changes')")).scalar() is None:
+                return 0
+            hi = db.execute(text("SELECT txid_snapshot_xmin(txid_current_snapshot())")).scalar()
+            if self._last_txid is None:
+                # 시작 시점 이전 변경은 캐시에 없으므로 건너뜀
+                self._last_txid = hi
+                return 0
+            customers = db.execute(text("""
+                SELECT DISTINCT customer_id FROM customers.customer_changes
+                WHERE txid >= :lo AND txid < :hi
+            """), {"lo": self._last_txid, "hi": hi}).scalars().all()
+        except Exception as e:
+            self.last_error = f"변경 피드 조회 실패: {str(e)}"
+            logger.warning(self.last_error)
+            return 0
+        finally:
+            db.close()
+        for customer_id in customers:
+            self.cache.invalidate_customer(customer_id)
+        self._last_txid = hi
+        self.last_error = None
+        self.customers_invalidated += len(customers)
+        return len(customers)
+
+    async def start(self):
+        if self.poll_seconds > 0:
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _poll_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self.poll)
+            await asyncio.sleep(self.poll_seconds)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "poll_seconds": self.poll_seconds,
+            "last_txid": self._last_txid,
+            "customers_invalidated": self.customers_invalidated,
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "last_error": self.last_error,
+        }
+
+
+# 앱 전역 예측 캐시 / 변경 피드 무효화 (app.main 의 startup/shutdown 에서 시작/종료)
+prediction_cache = PredictionCache()
+change_invalidator = ChangeFeedInvalidator(prediction_cache)
@@ -225,3 +225,44 @@ class RetentionResponse(RetentionBase):
 
     class Config:
         from_attributes = True
+
+# 이탈 예측 스키마 (ml_training_data 와 같은 피처 구성, 없는 값은 모델의 imputer 가 처리)
+class PredictRequest(BaseModel):
+    customer_id: str
+    age: Optional[float] = None
+    income_level: Optional[str] = None
+    credit_grade: Optional[str] = None
+    loan_amount: Optional[float] = None
+    interest_rate: Optional[float] = None
+    loan_term: Optional[float] = None
+    monthly_payment: Optional[float] = None
+    payment_history_months: Optional[float] = None
+    late_payments_3m: Optional[float] = None
+    late_payments_6m: Optional[float] = None
+    late_payments_12m: Optional[float] = None
+    credit_utilization: Optional[float] = None
+    debt_to_income_ratio: Optional[float] = None
+    employment_length_years: Optional[float] = None
+    number_of_accounts: Optional[float] = None
+    inquiries_last_6m: Optional[float] = None
+
+class PredictResponse(BaseModel):
+    customer_id: str
+    churn_probability: float
+    churn_prediction: bool
+    confidence_score: float
+    model_version: str
+    cached: bool = False
+
+# 고객별 예측 설명 (상위 SHAP 기여 피처, 로그 오즈 단위)
+class FeatureContribution(BaseModel):
+    feature: str
+    contribution: float
+
+class ExplanationResponse(BaseModel):
+    customer_id: str
+    model_version: str
+    churn_probability: Optional[float] = None
+    base_value: Optional[float] = None
+    contributions: List[FeatureContribution]
+    created_at: Optional[datetime] = None
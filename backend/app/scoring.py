@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .model_registry import ActiveModel, ModelRegistry, registry as default_registry
+from .shadow_scoring import ShadowScorer
+
+logger = logging.getLogger(__name__)
+
+# 마이크로 배치 설정: 최대 대기 시간(ms) / 최대 배치 크기 / 스코어링 스레드 수
+MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", "5"))
+MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "256"))
+SCORING_THREADS = int(os.getenv("PREDICT_THREADS", "2"))
+
+
+class LatencyTracker:
+    """최근 요청 지연시간(ms) 보관 및 백분위 계산"""
+
+    def __init__(self, maxlen: int = 10000):
+        self._samples = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, ms: float):
+        with self._lock:
+            self._samples.append(ms)
+            self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype=float)
+            count = self.count
+        if samples.size == 0:
+            return {"count": count, "p50_ms": None, "p99_ms": None, "max_ms": None}
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {
+            "count": count,
+            "p50_ms": round(float(p50), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(samples.max()), 3),
+        }
+
+
+class MicroBatchScorer:
+    """
+    동시 요청을 마이크로 배치로 묶어 한 번의 predict_proba 로 처리
+    - 첫 요청 도착 후 최대 MAX_WAIT_MS 동안(또는 MAX_BATCH_SIZE 까지) 모아서 스코어링
+    - 스코어링은 스레드 풀에서 실행 → 이벤트 루프를 막지 않음
+    - 모델은 레지스트리의 활성 모델을 배치마다 한 번 읽어 사용 (배치 도중 교체되어도 일관)
+    - 섀도 모델이 있으면 응답 후 같은 배치를 섀도 모델로 비교 스코어링
+    """
+
+    def __init__(self, registry: ModelRegistry = default_registry, max_wait_ms: float = MAX_WAIT_MS,
+                 max_batch_size: int = MAX_BATCH_SIZE, threads: int = SCORING_THREADS):
+        self.registry = registry
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.latency = LatencyTracker()
+        self.batch_sizes = LatencyTracker()
+        self.model_latency = LatencyTracker()
+        self.shadow = ShadowScorer()
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="scoring")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.registry.active() is not None
+
+    async def start(self):
+        await self.registry.start()
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        await self.registry.stop()
+        self.shadow.shutdown()
+        self._executor.shutdown(wait=False)
+
+    async def predict(self, features: Dict[str, Any]) -> Tuple[float, str]:
+        """피처 1건의 (이탈 확률, 모델 버전) (마이크로 배치로 처리)"""
+        if not self.ready:
+            raise RuntimeError("예측 모델이 로드되지 않았습니다.")
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        try:
+            return await future
+        finally:
+            self.latency.add((time.perf_counter() - start) * 1000.0)
+
+    def _score(self, rows: List[Dict[str, Any]]) -> Tuple[np.ndarray, ActiveModel]:
+        model = self.registry.active()
+        if model is None:
+            raise RuntimeError("예측 모델이 로드되지 않았습니다.")
+        # 요청에 없는 피처는 NaN → 파이프라인의 imputer 가 처리
+        df = pd.DataFrame.from_records(rows, columns=model.feature_names or None)
+        start = time.perf_counter()
+        proba = model.predict_proba(df)
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        self.model_latency.add(latency_ms)
+        shadow = self.registry.shadow()
+        if shadow is not None and shadow.version != model.version:
+            self.shadow.submit(pd.DataFrame.from_records(rows), model, shadow, proba, latency_ms)
+        return proba, model
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batch_sizes.add(len(batch))
+            rows = [features for features, _ in batch]
+            try:
+                proba, model = await loop.run_in_executor(self._executor, self._score, rows)
+                for (_, future), p in zip(batch, proba):
+                    if not future.done():
+                        future.set_result((float(p), model.version))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "model_loaded": self.ready,
+            "registry": self.registry.status(),
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "latency": self.latency.snapshot(),
+            "batch_size": self.batch_sizes.snapshot(),
+            "model_latency": self.model_latency.snapshot(),
+            "shadow": self.shadow.metrics(),
+        }
+
+
+# 앱 전역 스코어러 (app.main 의 startup/shutdown 에서 시작/종료)
+scorer = MicroBatchScorer()
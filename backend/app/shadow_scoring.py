@@ -0,0 +1,138 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from .database import SessionLocal
+from .model_registry import ActiveModel
+
+logger = logging.getLogger(__name__)
+
+# 섀도 비교 임계값 / 대기 중 섀도 배치 상한 (초과 시 버림 → 운영 경로 보호)
+SHADOW_THRESHOLD = float(os.getenv("SHADOW_THRESHOLD", "0.5"))
+SHADOW_MAX_PENDING = int(os.getenv("SHADOW_MAX_PENDING", "8"))
+
+
+class ShadowScorer:
+    """
+    운영 모델이 처리한 배치를 섀도(후보) 모델로 한 번 더 스코어링해 비교
+    - 운영 응답이 끝난 뒤 전용 스레드에서 실행 → 요청 지연에 영향 없음
+    - 배치별 점수 차이 / 임계값 기준 일치율 / 두 모델 지연시간을 ml.ml_shadow_scores 에 기록
+    """
+
+    def __init__(self, threshold: float = SHADOW_THRESHOLD, max_pending: int = SHADOW_MAX_PENDING):
+        self.threshold = threshold
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._table_ready = False
+        self.batches = 0
+        self.rows = 0
+        self.dropped = 0
+        self.agree = 0
+        self.abs_delta_sum = 0.0
+        self.errors = 0
+
+    def submit(self, df: pd.DataFrame, prod: ActiveModel, shadow: ActiveModel,
+               prod_proba: np.ndarray, prod_latency_ms: float):
+        """섀도 스코어링 예약 (대기 중인 배치가 많으면 버림)"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending += 1
+        self._executor.submit(self._run, df, prod, shadow, prod_proba, prod_latency_ms)
+
+    def _ensure_table(self, db):
+        if self._table_ready:
+            return
+        db.execute(text("""
+            CREATE TABLE IF NOT EXISTS ml.ml_shadow_scores (
+                id SERIAL PRIMARY KEY,
+                prod_version VARCHAR(50),
+                shadow_version VARCHAR(50),
+                batch_size INTEGER,
+                mean_abs_delta DECIMAL(8,6),
+                max_abs_delta DECIMAL(8,6),
+                mean_delta DECIMAL(8,6),
+                agreement_rate DECIMAL(6,4),
+                threshold DECIMAL(4,3),
+                prod_latency_ms DECIMAL(10,3),
+                shadow_latency_ms DECIMAL(10,3),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+
+    def _run(self, df, prod, shadow, prod_proba, prod_latency_ms):
+        try:
+            start = time.perf_counter()
+            frame = df.reindex(columns=shadow.feature_names) if shadow.feature_names else df
+            shadow_proba = shadow.predict_proba(frame)
+            shadow_latency_ms = (time.perf_counter() - start) * 1000.0
+
+            delta = shadow_proba - prod_proba
+            agree = int(((shadow_proba >= self.threshold) == (prod_proba >= self.threshold)).sum())
+            n = len(delta)
+            with self._lock:
+                self.batches += 1
+                self.rows += n
+                self.agree += agree
+                self.abs_delta_sum += float(np.abs(delta).sum())
+
+            db = SessionLocal()
+            try:
+                self._ensure_table(db)
+                db.execute(text("""
+                    INSERT INTO ml.ml_shadow_scores (
+                        prod_version, shadow_version, batch_size, mean_abs_delta, max_abs_delta,
+                        mean_delta, agreement_rate, threshold, prod_latency_ms, shadow_latency_ms
+                    ) VALUES (
+                        :prod_version, :shadow_version, :batch_size, :mean_abs_delta, :max_abs_delta,
+                        :mean_delta, :agreement_rate, :threshold, :prod_latency_ms, :shadow_latency_ms
+                    )
+                """), {
+                    "prod_version": prod.version,
+                    "shadow_version": shadow.version,
+                    "batch_size": n,
+                    "mean_abs_delta": float(np.abs(delta).mean()),
+                    "max_abs_delta": float(np.abs(delta).max()),
+                    "mean_delta": float(delta.mean()),
+                    "agreement_rate": agree / n,
+                    "threshold": self.threshold,
+                    "prod_latency_ms": prod_latency_ms,
+                    "shadow_latency_ms": shadow_latency_ms,
+                })
+                db.commit()
+                # CREATE TABLE 이 커밋된 뒤에만 생략 (롤백되면 다음 배치에서 다시 생성)
+                self._table_ready = True
+            finally:
+                db.close()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"섀도 스코어링 실패: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "rows": self.rows,
+                "dropped_batches": self.dropped,
+                "errors": self.errors,
+                "agreement_rate": round(self.agree / self.rows, 4) if self.rows else None,
+                "mean_abs_delta": round(self.abs_delta_sum / self.rows, 6) if self.rows else None,
+                "threshold": self.threshold,
+            }
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+콘텐츠 주소 기반(content-addressed) 아티팩트 저장소
+-----------------------------------------------------------------
+- 모든 아티팩트를 SHA-256 해시로 저장: <root>/objects/<해시 앞 2자리>/<해시><확장자>
+  → 같은 내용은 한 번만 저장(중복 제거), 한 번 저장된 파일은 덮어쓰지 않음
+- 모델(joblib)은 lz4 압축(미설치 시 zlib)으로 저장
+- 실행(run)별 매니페스트: <root>/manifests/<run_id>.json → 과거 모델도 즉시 로드 가능
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import joblib
+
+
+def _default_compress():
+    try:
+        import lz4  # noqa: F401
+        return ('lz4', 3)
+    except ImportError:
+        return ('zlib', 3)
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ArtifactStore:
+    """해시 기반 아티팩트 저장소"""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.manifests_dir = os.path.join(root, 'manifests')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    def _object_path(self, digest, ext):
+        return os.path.join(self.objects_dir, digest[:2], digest + ext)
+
+    def _commit(self, tmp_path, ext, size=None):
+        """임시 파일을 해시 경로로 이동 (이미 있으면 임시 파일만 삭제)"""
+        digest = _sha256_file(tmp_path)
+        path = self._object_path(digest, ext)
+        stored_size = os.path.getsize(tmp_path)
+        deduped = os.path.exists(path)
+        if deduped:
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return {
+            'sha256': digest,
+            'path': path,
+            'size': size if size is not None else stored_size,
+            'stored_size': stored_size,
+            'deduped': deduped,
+        }
+
+    def put_file(self, src_path):
+        """기존 파일을 그대로(무압축) 저장 - PNG 등 이미 압축된 파일용"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir)
+        os.close(fd)
+        shutil.copyfile(src_path, tmp_path)
+        return self._commit(tmp_path, os.path.splitext(src_path)[1])
+
+    def put_object(self, obj, compress=None):
+        """파이썬 객체를 압축 joblib 으로 저장"""
+        compress = compress or _default_compress()
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir)
+        os.close(fd)
+        joblib.dump(obj, tmp_path, compress=compress)
+        entry = self._commit(tmp_path, '.joblib')
+        entry['compress'] = list(compress)
+        return entry
+
+    def write_manifest(self, run_id, entries, extra=None):
+        """실행별 매니페스트 저장 후 경로 반환 (같은 run_id 로 다시 기록하면 원자적으로 교체)"""
+        manifest = {
+            'run_id': run_id,
+            'created_at': datetime.now().isoformat(),
+            'artifacts': entries,
+        }
+        if extra:
+            manifest.update(extra)
+        path = self.manifest_path(run_id)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fp:
+            json.dump(manifest, fp, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    def manifest_path(self, run_id):
+        return os.path.join(self.manifests_dir, f'{run_id}.json')
+
+    def load_manifest(self, run_id):
+        with open(self.manifest_path(run_id), encoding='utf-8') as fp:
+            return json.load(fp)
+
+    def load_model(self, run_id, name='Model Pipeline'):
+        """매니페스트에 기록된 모델 로드"""
+        entry = self.load_manifest(run_id)['artifacts'][name]
+        return joblib.load(entry['path'])
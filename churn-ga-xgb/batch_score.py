@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+고객 일괄(배치) 이탈 스코어링 → ml.ml_predictions
+-----------------------------------------------------------------
+- 학습된 파이프라인(model_pipeline.joblib)을 워커 프로세스마다 한 번만 로드
+  (모델 옆에 고속 스코어러 fast_scorer.joblib 이 있으면 예측은 고속 스코어러로 수행)
+- 고객 피처를 서버 사이드 커서로 청크 단위 스트리밍, 프로세스 풀에서 병렬 스코어링
+- 결과는 COPY 로 임시 테이블에 적재 후 ml.ml_predictions 에 (customer_id, model_version) 기준 upsert
+- --incremental: customers.customer_changes 의 워터마크(트랜잭션 id) 이후 변경된 고객만 재스코어링
+  (모델 버전이 바뀌었으면 전체 스코어링)
+- --explain_top_n: 고객별 상위 N개 기여 피처(XGBoost TreeSHAP pred_contribs, 원본 피처 단위)를
+  ml.ml_prediction_explanations 에 함께 저장 → 백엔드에서 인덱스 조회 한 번으로 설명 제공
+
+사용법 예시:
+$ python batch_score.py --model outputs/model_pipeline.joblib --workers 4 --chunksize 20000
+$ python batch_score.py --model outputs/model_pipeline.joblib --incremental
+"""
+
+import argparse
+import io
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import psycopg2
+
+from fast_scorer import load_fast_scorer
+from importance import feature_groups
+
+# 데이터베이스 연결 설정
+DB_CONFIG = {
+    'host': 'postgres',  # Docker 네트워크 내에서의 서비스명
+    'port': 5432,
+    'database': 'retention_db',
+    'user': 'retention_user',
+    'password': 'retention_password'
+}
+
+# 학습 테이블(ml_training_data)과 같은 컬럼 구성의 고객 피처 (백엔드 /api/ml_dashboard 와 동일한 산식)
+FEATURE_QUERY = """
+    SELECT
+        c.id,
+        c.customer_id,
+        c.age,
+        c.income_level,
+        c.credit_grade,
+        l.loan_amount,
+        l.interest_rate,
+        l.loan_term,
+        l.monthly_payment,
+        COALESCE(EXTRACT(MONTH FROM AGE(NOW(), l.application_date)), 0) as payment_history_months,
+        COALESCE(
+            (SELECT COUNT(*) FROM customers.repayments r
+             WHERE r.loan_id = l.loan_id
+             AND r.is_overdue = true
+             AND r.payment_date >= NOW() - INTERVAL '3 months'), 0
+        ) as late_payments_3m,
+        COALESCE(
+            (SELECT COUNT(*) FROM customers.repayments r
+             WHERE r.loan_id = l.loan_id
+             AND r.is_overdue = true
+             AND r.payment_date >= NOW() - INTERVAL '6 months'), 0
+        ) as late_payments_6m,
+        COALESCE(
+            (SELECT COUNT(*) FROM customers.repayments r
+             WHERE r.loan_id = l.loan_id
+             AND r.is_overdue = true
+             AND r.payment_date >= NOW() - INTERVAL '12 months'), 0
+        ) as late_payments_12m,
+        CASE
+            WHEN l.loan_amount > 0 THEN (l.monthly_payment * l.loan_term) / l.loan_amount
+            ELSE 0
+        END as credit_utilization,
+        CASE
+            WHEN c.income_level = '2000만원 미만' THEN 0.3
+            WHEN c.income_level = '2000-3000만원' THEN 0.4
+            WHEN c.income_level = '3000-4000만원' THEN 0.5
+            WHEN c.income_level = '4000-5000만원' THEN 0.6
+            WHEN c.income_level = '5000-7000만원' THEN 0.7
+            WHEN c.income_level = '7000만원 이상' THEN 0.8
+            ELSE 0.5
+        END as debt_to_income_ratio,
+        -- 원천 컬럼이 없는 피처는 customer_id 해시로 결정적으로 생성 (같은 고객은 항상 같은 값)
+        MOD(ABS(hashtext(c.customer_id || ':employment')::bigint), 20) + 1 as employment_length_years,
+        MOD(ABS(hashtext(c.customer_id || ':accounts')::bigint), 10) + 1 as number_of_accounts,
+        MOD(ABS(hashtext(c.customer_id || ':inquiries')::bigint), 5) as inquiries_last_6m,
+        c.created_at
+    FROM customers.customers c
+    LEFT JOIN customers.loans l ON c.customer_id = l.customer_id
+    {where}
+    ORDER BY c.id
+"""
+
+SCORING_JOB = 'batch_score'
+
+PREDICTION_COLUMNS = ['customer_id', 'prediction_date', 'churn_probability', 'churn_prediction',
+                      'model_version', 'confidence_score']
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="GA‑XGBoost churn batch scoring")
+    p.add_argument('--model', default='outputs/model_pipeline.joblib', help='학습된 파이프라인 경로')
+    p.add_argument('--fast_scorer', default=None, help='고속 스코어러 경로(기본: 모델 옆 fast_scorer.joblib, none 이면 미사용)')
+    p.add_argument('--model_version', default=None, help='결과에 기록할 모델 버전(기본: run_meta.json 또는 최신 DB 기록)')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='스코어링 프로세스 수')
+    p.add_argument('--chunksize', type=int, default=20000, help='DB 스트리밍/스코어링 청크 크기')
+    p.add_argument('--threshold', type=float, default=0.5, help='이탈 판정 임계값')
+    p.add_argument('--incremental', action='store_true', help='마지막 워터마크 이후 변경된 고객만 재스코어링')
+    p.add_argument('--prune_changes', action='store_true', help='처리한 변경 기록(customers.customer_changes) 삭제')
+    p.add_argument('--explain_top_n', type=int, default=5, help='고객별 저장할 상위 SHAP 기여 피처 수(0이면 생략)')
+    return p.parse_args()
+
+
+def ensure_prediction_table(conn):
+    """ml_predictions 테이블/인덱스 보장"""
+    with conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS ml")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS ml.ml_predictions (
+                id SERIAL PRIMARY KEY,
+                customer_id VARCHAR(100),
+                prediction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                churn_probability DECIMAL(6,4),
+                churn_prediction BOOLEAN,
+                model_version VARCHAR(50),
+                confidence_score DECIMAL(6,4),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ml_predictions_customer_date
+            ON ml.ml_predictions (customer_id, prediction_date)
+        """)
+        # upsert 키: 고객별·모델 버전별 최신 예측 1건 (기존 중복은 최신 행만 남김)
+        cur.execute("SELECT to_regclass('ml.uq_ml_predictions_customer_version')")
+        if cur.fetchone()[0] is None:
+            cur.execute("""
+                DELETE FROM ml.ml_predictions a
+                USING ml.ml_predictions b
+                WHERE a.customer_id = b.customer_id
+                AND a.model_version IS NOT DISTINCT FROM b.model_version
+                AND a.id < b.id
+            """)
+            cur.execute("""
+                CREATE UNIQUE INDEX uq_ml_predictions_customer_version
+                ON ml.ml_predictions (customer_id, model_version)
+            """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS ml.ml_prediction_explanations (
+                customer_id VARCHAR(100) NOT NULL,
+                model_version VARCHAR(50) NOT NULL,
+                base_value REAL,
+                top_features TEXT[],
+                contributions REAL[],
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (customer_id, model_version)
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS ml.ml_scoring_watermarks (
+                job_name VARCHAR(100) PRIMARY KEY,
+                last_change_id BIGINT NOT NULL,
+                model_version VARCHAR(50),
+                scored_rows INTEGER,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_txid BIGINT
+            )
+        """)
+        cur.execute("ALTER TABLE ml.ml_scoring_watermarks ADD COLUMN IF NOT EXISTS last_txid BIGINT")
+    conn.commit()
+
+
+def change_window(conn, incremental, model_version):
+    """
+    이번 실행이 처리할 변경 구간 반환: (lo, hi, 구간 내 최대 변경 id)
+    - 구간은 트랜잭션 id 기준 [lo, hi), hi = 현재 진행 중인 가장 오래된 트랜잭션(txid_snapshot_xmin)
+      → hi 미만 트랜잭션은 모두 종료되어 있으므로 아직 커밋 전인 변경을 건너뛰지 않음
+    - 변경 추적 테이블이 없으면 (None, None, None) → 전체 스코어링
+    - 워터마크가 없거나, 워터마크의 모델 버전이 다르거나, 전체 모드면 lo=None (전체)
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('customers.customer_changes')")
+        if cur.fetchone()[0] is None:
+            conn.commit()
+            return None, None, None
+        cur.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+        hi = cur.fetchone()[0]
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM customers.customer_changes WHERE txid < %s", (hi,))
+        max_id = cur.fetchone()[0]
+        lo = None
+        if incremental:
+            cur.execute("SELECT last_txid, model_version FROM ml.ml_scoring_watermarks WHERE job_name = %s",
+                        (SCORING_JOB,))
+            row = cur.fetchone()
+            if row is not None and row[0] is not None:
+                if row[1] == model_version:
+                    lo = row[0]
+                else:
+                    # 새 모델 버전은 일부 고객만 점수가 생기지 않도록 전체 스코어링
+                    print(f"모델 버전 변경 ({row[1]} → {model_version}): 전체 스코어링으로 전환합니다.")
+    conn.commit()
+    return lo, hi, max_id
+
+
+def resolve_model_version(conn, model_path, explicit=None):
+    """모델 버전 결정: 인자 > 모델 옆 run_meta.json > ml_model_performance 최신 기록 > 파일 수정 시각"""
+    if explicit:
+        return explicit
+    meta_path = os.path.join(os.path.dirname(model_path), 'run_meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as fp:
+            version = json.load(fp).get('model_version')
+        if version:
+            return version
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT model_version FROM ml.ml_model_performance ORDER BY training_date DESC LIMIT 1")
+            row = cur.fetchone()
+        conn.commit()
+        if row and row[0]:
+            return row[0]
+    except Exception:
+        conn.rollback()
+    return datetime.fromtimestamp(os.path.getmtime(model_path)).strftime('%Y%m%d_%H%M%S')
+
+
+def iter_feature_chunks(conn, chunksize, where=""):
+    """서버 사이드 커서로 고객 피처를 청크 단위 DataFrame 으로 스트리밍"""
+    with conn.cursor(name=f"ml_score_{uuid.uuid4().hex[:8]}") as cur:
+        cur.itersize = chunksize
+        cur.execute(FEATURE_QUERY.format(where=where))
+        columns = None
+        while True:
+            rows = cur.fetchmany(chunksize)
+            if not rows:
+                break
+            if columns is None:
+                columns = [d.name for d in cur.description]
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    conn.commit()
+
+
+# 워커 프로세스 전역: initializer에서 한 번만 로드
+_PIPELINE = None
+_FAST = None
+_BOOSTER = None
+_GROUP_NAMES = None
+_GROUP_MATRIX = None
+_TOP_N = 0
+
+
+def _init_worker(model_path, top_n=0, threads=1, fast_scorer_path=None):
+    global _PIPELINE, _FAST, _BOOSTER, _GROUP_NAMES, _GROUP_MATRIX, _TOP_N
+    import joblib
+    _PIPELINE = joblib.load(model_path)
+    # 프로세스 수만큼 병렬화하므로 워커당 XGBoost 스레드는 CPU / 워커 수
+    _PIPELINE.named_steps['clf'].set_params(n_jobs=threads)
+    if fast_scorer_path:
+        _FAST = load_fast_scorer(fast_scorer_path)
+        _FAST.booster.set_param({'nthread': threads})
+    _TOP_N = top_n
+    if top_n > 0:
+        _BOOSTER = _PIPELINE.named_steps['clf'].get_booster()
+        _BOOSTER.set_param({'nthread': threads})
+        groups = feature_groups(_PIPELINE.named_steps['pre'])
+        n_out = sum(len(idx) for _, idx in groups)
+        # 출력 컬럼별 SHAP → 원본 피처별 합산용 0/1 행렬
+        _GROUP_MATRIX = np.zeros((n_out, len(groups)), dtype=np.float32)
+        for g, (_, idx) in enumerate(groups):
+            _GROUP_MATRIX[idx, g] = 1.0
+        _GROUP_NAMES = [name for name, _ in groups]
+
+
+def _transform(df):
+    """전처리 (고속 스코어러가 있으면 NumPy 변환, 없으면 ColumnTransformer)"""
+    if _FAST is not None:
+        return _FAST.transform(df)
+    return np.asarray(_PIPELINE.named_steps['pre'].transform(df), dtype=np.float32)
+
+
+def _explain(dmat):
+    """원본 피처 단위 상위 N개 SHAP 기여도 → (피처 인덱스[n, N], 기여도[n, N], 기댓값)"""
+    contribs = _BOOSTER.predict(dmat, pred_contribs=True)
+    grouped = contribs[:, :-1] @ _GROUP_MATRIX
+    n = min(_TOP_N, grouped.shape[1])
+    top = np.argpartition(-np.abs(grouped), n - 1, axis=1)[:, :n]
+    top_vals = np.take_along_axis(grouped, top, axis=1)
+    order = np.argsort(-np.abs(top_vals), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    return top, np.take_along_axis(top_vals, order, axis=1), float(contribs[0, -1]) if len(contribs) else 0.0
+
+
+def score_chunk(df):
+    """워커: 청크 스코어링 → (customer_id 배열, 확률 배열, 설명 또는 None)"""
+    explain = None
+    if _TOP_N > 0:
+        import xgboost as xgb
+        # 전처리 한 번 → 같은 DMatrix 로 확률과 기여도 계산
+        dmat = xgb.DMatrix(_transform(df))
+        proba = _BOOSTER.predict(dmat)
+        top, vals, base_value = _explain(dmat)
+        explain = (_GROUP_NAMES, top, vals, base_value)
+    elif _FAST is not None:
+        proba = _FAST.predict_proba(df)
+    else:
+        proba = _PIPELINE.predict_proba(df)[:, 1]
+    return df['customer_id'].to_numpy(), proba, explain
+
+
+def create_stage_table(conn):
+    """트랜잭션 범위 임시 적재 테이블 (예측과 설명을 같은 행에 적재)"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE ml_scoring_stage (
+                customer_id VARCHAR(100),
+                prediction_date TIMESTAMP,
+                churn_probability DECIMAL(6,4),
+                churn_prediction BOOLEAN,
+                model_version VARCHAR(50),
+                confidence_score DECIMAL(6,4),
+                raw_probability DOUBLE PRECISION,
+                base_value REAL,
+                top_features TEXT[],
+                contributions REAL[]
+            ) ON COMMIT DROP
+        """)
+
+
+def merge_stage(conn):
+    """
+    임시 테이블 → ml.ml_predictions / ml.ml_prediction_explanations upsert
+    - 대출이 여러 건인 고객은 반올림 전 확률이 가장 높은 1건을 한 번만 골라 예측과 설명을 모두 그 행에서 저장
+    """
+    cols = ', '.join(PREDICTION_COLUMNS)
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE ml_scoring_picked ON COMMIT DROP AS
+            SELECT DISTINCT ON (customer_id) *
+            FROM ml_scoring_stage
+            ORDER BY customer_id, raw_probability DESC
+        """)
+        cur.execute("""
+            INSERT INTO ml.ml_prediction_explanations (customer_id, model_version, base_value, top_features, contributions)
+            SELECT customer_id, model_version, base_value, top_features, contributions
+            FROM ml_scoring_picked
+            WHERE top_features IS NOT NULL
+            ON CONFLICT (customer_id, model_version) DO UPDATE SET
+                base_value = EXCLUDED.base_value,
+                top_features = EXCLUDED.top_features,
+                contributions = EXCLUDED.contributions,
+                created_at = CURRENT_TIMESTAMP
+        """)
+        cur.execute(f"""
+            INSERT INTO ml.ml_predictions ({cols})
+            SELECT {cols}
+            FROM ml_scoring_picked
+            ON CONFLICT (customer_id, model_version) DO UPDATE SET
+                prediction_date = EXCLUDED.prediction_date,
+                churn_probability = EXCLUDED.churn_probability,
+                churn_prediction = EXCLUDED.churn_prediction,
+                confidence_score = EXCLUDED.confidence_score,
+                created_at = CURRENT_TIMESTAMP
+        """)
+        return cur.rowcount
+
+
+def _pg_array(values):
+    """COPY(csv)용 PostgreSQL 배열 리터럴"""
+    items = []
+    for v in values:
+        if isinstance(v, str):
+            items.append('"' + v.replace('\\', '\\\\').replace('"', '\\"') + '"')
+        else:
+            items.append(f"{v:.6g}")
+    return '{' + ','.join(items) + '}'
+
+
+def write_chunk(conn, result, model_version, prediction_date, threshold):
+    """워커 결과 1청크를 COPY 로 임시 테이블에 적재 (커밋은 호출 측), 적재 행 수 반환"""
+    customer_ids, proba, explain = result
+    out = pd.DataFrame({
+        'customer_id': customer_ids,
+        'prediction_date': prediction_date,
+        'churn_probability': np.round(proba, 4),
+        'churn_prediction': proba >= threshold,
+        'model_version': model_version,
+        'confidence_score': np.round(np.maximum(proba, 1 - proba), 4),
+        'raw_probability': proba,
+    })
+    if explain is not None:
+        # 상위 N개 기여 피처 (설명이 없으면 빈 값 → NULL)
+        names, top, vals, base_value = explain
+        names = np.asarray(names, dtype=object)
+        out['base_value'] = base_value
+        out['top_features'] = [_pg_array(row) for row in names[top]]
+        out['contributions'] = [_pg_array(row) for row in vals]
+    buf = io.StringIO()
+    out.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    with conn.cursor() as cur:
+        cur.copy_expert(
+            f"COPY ml_scoring_stage ({', '.join(out.columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+    return len(out)
+
+
+def resolve_fast_scorer(model_path, explicit=None):
+    """고속 스코어러 경로: 인자(none 이면 미사용) > 모델 옆 fast_scorer.joblib"""
+    if explicit:
+        return None if explicit.lower() == 'none' else explicit
+    path = os.path.join(os.path.dirname(model_path), 'fast_scorer.joblib')
+    return path if os.path.exists(path) else None
+
+
+def run_batch_scoring(model_path, model_version=None, workers=1, chunksize=20000, threshold=0.5,
+                      incremental=False, prune_changes=False, explain_top_n=5, fast_scorer_path=None):
+    """
+    배치 스코어링 실행: 읽기(서버 사이드 커서) / 스코어링(프로세스 풀) / 쓰기(COPY)를 파이프라인으로 진행
+    upsert 와 워터마크 갱신은 하나의 트랜잭션으로 커밋
+    """
+    read_conn = psycopg2.connect(**DB_CONFIG)
+    # NUMERIC(Decimal) 컬럼을 float 으로 받아 워커로 넘길 때 object 컬럼이 생기지 않도록
+    psycopg2.extensions.register_type(
+        psycopg2.extensions.new_type(psycopg2.extensions.DECIMAL.values, 'DEC2FLOAT',
+                                     lambda v, cur: float(v) if v is not None else None),
+        read_conn)
+    write_conn = psycopg2.connect(**DB_CONFIG)
+    start = time.perf_counter()
+    scored = 0
+    try:
+        ensure_prediction_table(write_conn)
+        model_version = resolve_model_version(write_conn, model_path, model_version)
+        lo, hi, max_change_id = change_window(write_conn, incremental, model_version)
+        where = ""
+        if lo is not None:
+            if hi <= lo:
+                print(f"변경된 고객이 없습니다 (watermark txid={lo}).")
+                return 0, model_version
+            where = (f"WHERE c.customer_id IN (SELECT DISTINCT customer_id FROM customers.customer_changes "
+                     f"WHERE txid >= {int(lo)} AND txid < {int(hi)})")
+        prediction_date = datetime.now()
+        mode = f"incremental txid [{lo}, {hi})" if lo is not None else "full"
+        fast_scorer_path = resolve_fast_scorer(model_path, fast_scorer_path)
+        print(f"배치 스코어링 시작: model_version={model_version}, mode={mode}, workers={workers}, chunk={chunksize:,}, "
+              f"fast_scorer={'on' if fast_scorer_path else 'off'}")
+        create_stage_table(write_conn)
+
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model_path, explain_top_n, threads, fast_scorer_path)) as ex:
+            pending = []
+            for df in iter_feature_chunks(read_conn, chunksize, where=where):
+                pending.append(ex.submit(score_chunk, df))
+                # 동시에 진행 중인 청크 수를 제한해 메모리 사용량을 일정하게 유지
+                while len(pending) >= workers * 2:
+                    scored += write_chunk(write_conn, pending.pop(0).result(), model_version, prediction_date, threshold)
+            for f in pending:
+                scored += write_chunk(write_conn, f.result(), model_version, prediction_date, threshold)
+        upserted = merge_stage(write_conn)
+        if hi is not None:
+            with write_conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO ml.ml_scoring_watermarks (job_name, last_change_id, last_txid, model_version, scored_rows)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (job_name) DO UPDATE SET
+                        last_change_id = EXCLUDED.last_change_id,
+                        last_txid = EXCLUDED.last_txid,
+                        model_version = EXCLUDED.model_version,
+                        scored_rows = EXCLUDED.scored_rows,
+                        updated_at = CURRENT_TIMESTAMP
+                """, (SCORING_JOB, max_change_id, hi, model_version, upserted))
+                if prune_changes:
+                    # 진행 중이던 트랜잭션(txid >= hi)의 변경은 다음 실행 몫이므로 남김
+                    cur.execute("DELETE FROM customers.customer_changes WHERE txid < %s", (hi,))
+        write_conn.commit()
+    except Exception:
+        write_conn.rollback()
+        raise
+    finally:
+        read_conn.close()
+        write_conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ 배치 스코어링 완료: {scored:,} 행 → {upserted:,} 고객 upsert, "
+          f"{elapsed:.1f}초 ({scored / max(elapsed, 1e-9):,.0f} 행/초)")
+    return scored, model_version
+
+
+def main():
+    args = parse_args()
+    run_batch_scoring(args.model, model_version=args.model_version, workers=args.workers,
+                      chunksize=args.chunksize, threshold=args.threshold,
+                      incremental=args.incremental, prune_changes=args.prune_changes,
+                      explain_top_n=args.explain_top_n, fast_scorer_path=args.fast_scorer)
+
+
+if __name__ == '__main__':
+    main()
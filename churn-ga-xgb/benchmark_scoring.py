@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+저장된 파이프라인의 서빙 비용 벤치마크
+-----------------------------------------------------------------
+- 로드 시간 / 메모리 사용량(파일 크기, 로드 후 RSS 증가량, 최대 배치 예측 시 RSS 피크 증가량)
+  (RSS 기준 → XGBoost Booster / NumPy 네이티브 버퍼까지 포함)
+- 단건(1행) 지연시간 백분위 (p50/p90/p99)
+- 배치 크기별 처리량 (1 ~ 100k 행)
+- run_meta.json 의 numeric_features / categorical_features 와 같은 구성의 합성 행 사용
+  (분포는 학습된 전처리 통계: 수치형은 평균/표준편차, 범주형은 학습 범주에서 추출)
+- 고속 스코어러(fast_scorer.joblib)가 있으면 같은 조건으로 함께 측정
+- 학습 프로세스의 힙/스레드 풀 영향을 받지 않도록 학습 스크립트는 새 프로세스로 실행
+
+사용법 예시:
+$ python benchmark_scoring.py --model outputs/model_pipeline.joblib --meta outputs/run_meta.json --report outputs/report.md
+"""
+
+import argparse
+import gc
+import json
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import psutil
+
+from fast_scorer import compile_pipeline, load_fast_scorer
+
+DEFAULT_BATCH_SIZES = (1, 10, 100, 1000, 10000, 100000)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Scoring latency / throughput benchmark")
+    p.add_argument('--model', default='outputs/model_pipeline.joblib', help='학습된 파이프라인 경로')
+    p.add_argument('--meta', default=None, help='run_meta.json 경로 (기본: 모델과 같은 디렉토리)')
+    p.add_argument('--fast_scorer', default=None, help='고속 스코어러 경로 (기본: 모델과 같은 디렉토리에 있으면 사용)')
+    p.add_argument('--batch_sizes', default=','.join(map(str, DEFAULT_BATCH_SIZES)), help='측정할 배치 크기 목록')
+    p.add_argument('--iters', type=int, default=500, help='단건 지연시간 측정 반복 횟수')
+    p.add_argument('--report', default=None, help='결과를 추가할 report.md 경로')
+    p.add_argument('--out', default=None, help='결과 JSON 저장 경로')
+    p.add_argument('--numeric_features', default=None, help='수치형 피처 목록 (콤마 구분, 기본: run_meta.json)')
+    p.add_argument('--categorical_features', default=None, help='범주형 피처 목록 (콤마 구분, 기본: run_meta.json)')
+    p.add_argument('--model_version', default=None, help='결과에 기록할 모델 버전 (기본: run_meta.json)')
+    return p.parse_args()
+
+
+def synthetic_rows(artifact, n, numeric_features=None, categorical_features=None, seed=42):
+    """
+    학습 피처 구성과 같은 합성 DataFrame 생성
+    Args:
+        artifact: compile_pipeline() 결과 (전처리 통계)
+    """
+    rng = np.random.RandomState(seed)
+    num_stats = dict(zip(artifact['num_cols'], zip(artifact['num_mean'], artifact['num_scale'])))
+    cat_values = dict(zip(artifact['cat_cols'], artifact['cat_categories']))
+    numeric_features = numeric_features or artifact['num_cols']
+    categorical_features = categorical_features or artifact['cat_cols']
+
+    data = {}
+    for col in numeric_features:
+        mean, scale = num_stats.get(col, (0.0, 1.0))
+        data[col] = rng.normal(mean, scale if scale > 0 else 1.0, size=n)
+    for col in categorical_features:
+        cats = cat_values.get(col)
+        if cats is None or len(cats) == 0:
+            data[col] = np.full(n, 'unknown', dtype=object)
+        else:
+            data[col] = np.asarray(cats, dtype=object)[rng.randint(0, len(cats), size=n)]
+    return pd.DataFrame(data, columns=list(numeric_features) + list(categorical_features))
+
+
+def _percentiles(samples_ms):
+    arr = np.asarray(samples_ms, dtype=float)
+    p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+    return {'p50_ms': float(p50), 'p90_ms': float(p90), 'p99_ms': float(p99), 'mean_ms': float(arr.mean())}
+
+
+def measure_latency(predict, df, iters):
+    """1행 예측 지연시간 (행을 바꿔가며 iters 회)"""
+    rows = [df.iloc[[i % len(df)]] for i in range(min(iters, len(df)))]
+    predict(rows[0])  # 워밍업
+    samples = []
+    for i in range(iters):
+        start = time.perf_counter()
+        predict(rows[i % len(rows)])
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return _percentiles(samples)
+
+
+def measure_throughput(predict, df, batch_sizes, min_seconds=0.2, max_repeats=50):
+    """배치 크기별 처리량 (반복 중앙값 기준 rows/s)"""
+    results = []
+    for bs in batch_sizes:
+        batch = df.iloc[:bs]
+        predict(batch)  # 워밍업
+        times = []
+        total = 0.0
+        while len(times) < max_repeats and (total < min_seconds or len(times) < 3):
+            start = time.perf_counter()
+            predict(batch)
+            elapsed = time.perf_counter() - start
+            times.append(elapsed)
+            total += elapsed
+        median = float(np.median(times))
+        results.append({
+            'batch_size': int(bs),
+            'median_ms': median * 1000.0,
+            'rows_per_s': bs / median if median > 0 else None,
+            'repeats': len(times),
+        })
+    return results
+
+
+def _rss():
+    return psutil.Process().memory_info().rss
+
+
+def measure_load(path, loader, repeats=3):
+    """로드 시간(최소/중앙값)과 첫 로드 전후 RSS 증가량(MB, 해제된 메모리를 재사용하면 음수일 수 있음)"""
+    gc.collect()
+    before = _rss()
+    start = time.perf_counter()
+    obj = loader(path)
+    times = [time.perf_counter() - start]
+    resident = _rss() - before
+    for _ in range(repeats - 1):
+        gc.collect()
+        start = time.perf_counter()
+        loader(path)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    return obj, {
+        'load_s_min': float(min(times)),
+        'load_s_median': float(np.median(times)),
+        'file_mb': os.path.getsize(path) / 1e6,
+        'resident_mb': resident / 1e6,
+    }
+
+
+def measure_peak(predict, df, interval=0.002):
+    """최대 배치 예측 중 RSS 피크 증가량 (MB, 별도 스레드에서 interval 초마다 샘플링)"""
+    gc.collect()
+    proc = psutil.Process()
+    baseline = proc.memory_info().rss
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], proc.memory_info().rss)
+            done.wait(interval)
+
+    t = threading.Thread(target=sample, daemon=True)
+    t.start()
+    try:
+        predict(df)
+    finally:
+        done.set()
+        t.join()
+    peak[0] = max(peak[0], proc.memory_info().rss)
+    return (peak[0] - baseline) / 1e6
+
+
+def benchmark(model_path, meta_path=None, fast_scorer_path=None, batch_sizes=DEFAULT_BATCH_SIZES, iters=500,
+              numeric_features=None, categorical_features=None):
+    """
+    파이프라인(및 고속 스코어러) 서빙 비용 측정
+    - 피처 구성은 인자 > run_meta.json > 파이프라인 순으로 결정
+    Returns:
+        결과 dict (JSON 직렬화 가능)
+    """
+    model_dir = os.path.dirname(model_path)
+    meta_path = meta_path or os.path.join(model_dir, 'run_meta.json')
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as fp:
+            meta = json.load(fp)
+    if fast_scorer_path is None and os.path.exists(os.path.join(model_dir, 'fast_scorer.joblib')):
+        fast_scorer_path = os.path.join(model_dir, 'fast_scorer.joblib')
+
+    pipeline, load_stats = measure_load(model_path, joblib.load)
+    artifact = compile_pipeline(pipeline)
+    batch_sizes = sorted(int(b) for b in batch_sizes)
+    df = synthetic_rows(artifact, max(batch_sizes + [iters]),
+                        numeric_features=numeric_features or meta.get('numeric_features'),
+                        categorical_features=categorical_features or meta.get('categorical_features'))
+
+    def predict_pipeline(frame):
+        return pipeline.predict_proba(frame)[:, 1]
+
+    results = {
+        'model_path': model_path,
+        'model_version': meta.get('model_version'),
+        'n_features': len(df.columns),
+        'scorers': {
+            'pipeline': {
+                'load': load_stats,
+                'latency_1row': measure_latency(predict_pipeline, df, iters),
+                'throughput': measure_throughput(predict_pipeline, df, batch_sizes),
+                'peak_predict_mb': measure_peak(predict_pipeline, df.iloc[:batch_sizes[-1]]),
+            }
+        },
+    }
+    if fast_scorer_path and os.path.exists(fast_scorer_path):
+        fast, fast_load = measure_load(fast_scorer_path, load_fast_scorer)
+        results['scorers']['fast_scorer'] = {
+            'load': fast_load,
+            'latency_1row': measure_latency(fast.predict_proba, df, iters),
+            'throughput': measure_throughput(fast.predict_proba, df, batch_sizes),
+            'peak_predict_mb': measure_peak(fast.predict_proba, df.iloc[:batch_sizes[-1]]),
+        }
+    return results
+
+
+def to_markdown(results):
+    """report.md 에 추가할 서빙 비용 섹션"""
+    lines = ["## 서빙 비용 벤치마크", ""]
+    lines.append(f"- 합성 입력 피처 수: {results['n_features']} (run_meta.json 피처 구성)")
+    lines.append("")
+    for name, r in results['scorers'].items():
+        load, lat = r['load'], r['latency_1row']
+        lines.append(f"### {name}")
+        lines.append(f"- 로드 시간: {load['load_s_median']*1000:.1f} ms (최소 {load['load_s_min']*1000:.1f} ms)")
+        lines.append(f"- 메모리(RSS): 파일 {load['file_mb']:.2f} MB, 로드 후 {load['resident_mb']:+.2f} MB, "
+                     f"최대 배치 예측 피크 +{r['peak_predict_mb']:.1f} MB")
+        lines.append(f"- 단건 지연시간: p50 {lat['p50_ms']:.3f} ms | p90 {lat['p90_ms']:.3f} ms | p99 {lat['p99_ms']:.3f} ms")
+        lines.append("")
+        lines.append("| 배치 크기 | 중앙값 (ms) | 처리량 (rows/s) |")
+        lines.append("|---:|---:|---:|")
+        for t in r['throughput']:
+            lines.append(f"| {t['batch_size']:,} | {t['median_ms']:.2f} | {t['rows_per_s']:,.0f} |")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def append_to_report(report_path, results):
+    with open(report_path, 'a', encoding='utf-8') as f:
+        f.write("\n" + to_markdown(results))
+    return report_path
+
+
+def _split(value):
+    return [v.strip() for v in value.split(',') if v.strip()] if value else None
+
+
+def main():
+    args = parse_args()
+    results = benchmark(args.model, meta_path=args.meta, fast_scorer_path=args.fast_scorer,
+                        batch_sizes=[int(b) for b in _split(args.batch_sizes)],
+                        iters=args.iters, numeric_features=_split(args.numeric_features),
+                        categorical_features=_split(args.categorical_features))
+    if args.model_version:
+        results['model_version'] = args.model_version
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as fp:
+            json.dump(results, fp, ensure_ascii=False, indent=2)
+    if args.report:
+        append_to_report(args.report, results)
+    print(to_markdown(results))
+
+
+if __name__ == '__main__':
+    main()
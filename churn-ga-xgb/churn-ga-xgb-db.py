@@ -19,8 +19,13 @@ $ python churn_ga_xgb_db.py --table ml_training_data --target EverDelinquent \
 
 import argparse
 import json
+import multiprocessing
 import os
+import subprocess
+import sys
+import time
 import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -33,20 +38,28 @@ from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.metrics import (average_precision_score, brier_score_loss,
                              classification_report, confusion_matrix,
-                             precision_recall_curve, precision_score,
-                             recall_score, roc_auc_score, roc_curve)
+                             precision_score, recall_score, roc_auc_score)
 from sklearn.model_selection import StratifiedKFold, train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
 from xgboost import XGBClassifier
 
+from db_reader import (describe_table, load_schema_features, load_table,
+                       project_columns, read_snapshot,
+                       snapshot_key, write_snapshot)
+from artifact_store import ArtifactStore
+from benchmark_scoring import DEFAULT_BATCH_SIZES
+from fast_scorer import export_fast_scorer
+from importance import feature_groups, permutation_importance
+from shared_data import FoldStore, eval_candidate, init_worker
+
 try:
     import shap  # type: ignore
     _HAS_SHAP = True
 except Exception:
     _HAS_SHAP = False
-    warnings.warn("shap이 설치되지 않아 SHAP 리포트를 건너뜁니다. 'pip install shap' 후 사용하세요.")
+    warnings.warn("shap이 설치되지 않아 SHAP 플롯을 건너뜁니다(집계는 XGBoost 내장 TreeSHAP 사용). 'pip install shap' 후 사용하세요.")
 
 RANDOM_STATE = 42
 np.random.seed(RANDOM_STATE)
@@ -90,57 +103,128 @@ def parse_args():
     p.add_argument('--outdir', default='outputs', help='결과 출력 폴더')
     p.add_argument('--scoring', default='pr_auc', choices=['pr_auc','f1'], help='GA 적합도 지표')
     p.add_argument('--threads', type=int, default=0, help='XGB n_jobs(0이면 자동)')
+    p.add_argument('--workers', type=int, default=1, help='GA 후보 병렬 평가 프로세스 수(1이면 순차)')
+    p.add_argument('--artifacts', default='full', choices=['full','minimal','none'],
+                   help='리포트 생성 범위(full: 전체, minimal: FI CSV + 리포트, none: 모델/메타만)')
+    p.add_argument('--curve_bins', type=int, default=1000, help='PR/ROC 곡선 근사용 점수 구간 수')
+    p.add_argument('--perm_repeats', type=int, default=3, help='순열 중요도 반복 횟수(0이면 생략)')
+    p.add_argument('--perm_workers', type=int, default=0, help='순열 중요도 워커 프로세스 수(0이면 CPU 수)')
+    p.add_argument('--bench_iters', type=int, default=500, help='서빙 벤치마크 단건 지연시간 측정 반복 횟수')
+    p.add_argument('--bench_max_batch', type=int, default=100000, help='서빙 벤치마크 최대 배치 크기')
+    p.add_argument('--skip_benchmark', action='store_true', help='서빙 비용 벤치마크 생략')
+    p.add_argument('--skip_artifacts', dest='artifacts', action='store_const', const='none',
+                   help='재학습 전용: 리포트 생성 생략(--artifacts none 과 동일)')
+    p.add_argument('--chunksize', type=int, default=50000, help='DB 스트리밍 로드 청크 크기')
+    p.add_argument('--load_method', default='copy', choices=['copy','stream'], help='DB 로드 방식(COPY 고속 경로/커서 스트리밍)')
+    p.add_argument('--cache_dir', default=None, help='테이블 스냅샷 캐시 폴더(기본: <outdir>/cache)')
+    p.add_argument('--refresh_cache', action='store_true', help='스냅샷 캐시를 무시하고 DB에서 다시 로드')
+    p.add_argument('--tune_sample', type=float, default=1.0, help='GA 튜닝에 사용할 학습 데이터 층화 샘플 비율(1.0이면 전체 학습 데이터)')
+    p.add_argument('--sample_seed', type=int, default=RANDOM_STATE, help='튜닝 샘플링 시드')
+    p.add_argument('--schema_yaml', default='data/data_schema.yaml', help='컬럼 투영용 스키마 파일')
+    p.add_argument('--feature_dict', default='data/feature_dictionary.csv', help='컬럼 투영용 피처 사전')
     return p.parse_args()
 
 
-def load_data_from_db(table_name):
+_ENGINE = None
+
+
+def get_engine():
     """
-    PostgreSQL DB에서 데이터 로드
+    프로세스 내에서 재사용하는 SQLAlchemy 엔진
     """
-    try:
-        # SQLAlchemy 엔진 생성
-        engine = create_engine(
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = create_engine(
             f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
         )
-        
+    return _ENGINE
+
+
+def load_data_from_db(table_name, args=None):
+    """
+    PostgreSQL DB에서 데이터 로드 (COPY 고속 경로 또는 서버 사이드 커서 스트리밍 + 컬럼 투영)
+    스냅샷 캐시 키가 일치하면 로컬 Arrow 스냅샷을 재사용
+
+    Returns:
+        (DataFrame, 로드 통계 dict)
+    """
+    try:
         print(f"DB에서 데이터를 로드하는 중: {table_name}")
-        
-        # 데이터 로드
-        query = f"SELECT * FROM {table_name}"
-        df = pd.read_sql(query, engine)
-        
-        print(f"데이터 로드 완료: {len(df)} 행, {len(df.columns)} 컬럼")
-        
-        return df
+
+        raw_conn = get_engine().raw_connection()
+        try:
+            columns, cache_dir, refresh = None, None, False
+            chunksize, method = 50000, 'copy'
+            if args is not None:
+                chunksize, method = args.chunksize, args.load_method
+                cache_dir = args.cache_dir or os.path.join(args.outdir, 'cache')
+                refresh = args.refresh_cache
+                wanted = load_schema_features(args.schema_yaml, args.feature_dict)
+                table_cols = [c for c, _ in describe_table(raw_conn, table_name)]
+                columns = project_columns(table_cols, wanted, required=[args.target, args.id_col, args.date_col])
+
+            df, key = None, None
+            if cache_dir:
+                start = time.perf_counter()
+                key = snapshot_key(raw_conn, table_name, columns)
+                if not refresh:
+                    df = read_snapshot(cache_dir, key)
+                if df is not None:
+                    load_stats = {'method': 'cache', 'rows': int(len(df)),
+                                  'seconds': round(time.perf_counter() - start, 3), 'cache_key': key['hash']}
+            if df is None:
+                df, load_stats = load_table(raw_conn, table_name, columns=columns, method=method, chunksize=chunksize)
+                if key is not None:
+                    write_snapshot(cache_dir, key, df)
+                    load_stats['cache_key'] = key['hash']
+        finally:
+            raw_conn.close()
+
+        print(f"데이터 로드 완료: {len(df)} 행, {len(df.columns)} 컬럼 "
+              f"({load_stats['method']}, {load_stats.get('mb_per_s', '-')} MB/s)")
+
+        return df, load_stats
         
     except Exception as e:
         print(f"❌ DB 데이터 로드 오류: {str(e)}")
         raise
 
 
-def save_model_performance_to_db(metrics, best_params, model_path, report_path, args):
+def tuning_sample(train_df, target, frac, seed=RANDOM_STATE):
     """
-    모델 성능을 DB에 저장
+    GA 튜닝용 타깃 클래스별 층화 샘플 (최종 학습은 전체 학습 데이터 사용)
+    이미 로드한 학습 분할에서 뽑으므로 DB 재조회가 없고 테스트 행이 섞이지 않음
+    """
+    start = time.perf_counter()
+    sample_df = (train_df.groupby(target, group_keys=False)
+                 .sample(frac=frac, random_state=seed)
+                 .sort_index())
+    print(f"GA 튜닝 샘플: {len(sample_df)} 행 (층화, 비율 {frac})")
+    return sample_df, {'method': 'stratified_sample', 'rows': int(len(sample_df)),
+                       'seconds': round(time.perf_counter() - start, 3)}
+
+
+def save_model_performance_to_db(metrics, best_params, model_path, report_path, args, model_version=None, manifest_path=None):
+    """
+    모델 성능을 DB에 저장 (model_path는 아티팩트 저장소의 불변 경로, manifest_path는 실행별 매니페스트)
     """
     try:
-        engine = create_engine(
-            f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
-        )
-        
+        engine = get_engine()
+
         with engine.connect() as conn:
             conn.execute(text("""
-                INSERT INTO ml_model_performance (
+                INSERT INTO ml.ml_model_performance (
                     model_name, model_version, test_size, kfold,
                     roc_auc, pr_auc, f1_score, precision_score, recall_score, brier_score,
-                    precision_at_k, recall_at_k, best_params, model_path, report_path
+                    precision_at_k, recall_at_k, best_params, model_path, report_path, manifest_path
                 ) VALUES (
                     :model_name, :model_version, :test_size, :kfold,
                     :roc_auc, :pr_auc, :f1_score, :precision_score, :recall_score, :brier_score,
-                    :precision_at_k, :recall_at_k, :best_params, :model_path, :report_path
+                    :precision_at_k, :recall_at_k, :best_params, :model_path, :report_path, :manifest_path
                 )
             """), {
                 'model_name': 'GA-XGBoost-Churn',
-                'model_version': datetime.now().strftime('%Y%m%d_%H%M%S'),
+                'model_version': model_version or datetime.now().strftime('%Y%m%d_%H%M%S'),
                 'test_size': args.test_size,
                 'kfold': args.kfold,
                 'roc_auc': metrics.get('roc_auc', 0),
@@ -153,14 +237,16 @@ def save_model_performance_to_db(metrics, best_params, model_path, report_path,
                 'recall_at_k': metrics.get('recall_at_k', 0),
                 'best_params': json.dumps(best_params),
                 'model_path': model_path,
-                'report_path': report_path
+                'report_path': report_path,
+                'manifest_path': manifest_path
             })
             conn.commit()
             
         print("✅ 모델 성능이 DB에 저장되었습니다.")
         
     except Exception as e:
-        print(f"❌ DB 저장 오류: {str(e)}")
+        # 레지스트리(백엔드)는 이 기록으로 새 모델을 찾으므로 실패를 드러냄
+        warnings.warn(f"모델 성능 DB 저장 실패 (백엔드 레지스트리에 반영되지 않음): {str(e)}")
 
 
 def split_train_test(df, target, date_col=None, test_size=0.2):
@@ -280,15 +366,36 @@ def eval_params(params, X, y, preprocessor, kfold=5, scoring='pr_auc', threads=0
     return score, np.mean(pr_aucs), np.mean(f1s)
 
 
-def ga_optimize(X, y, preprocessor, generations=20, population=36, elitism=2, cx_rate=0.8, mut_rate=0.15, kfold=5, scoring='pr_auc', threads=0):
+def ga_optimize(X, y, preprocessor, generations=20, population=36, elitism=2, cx_rate=0.8, mut_rate=0.15, kfold=5, scoring='pr_auc', threads=0, workers=1, tmp_dir=None):
     space = GASearchSpace()
     pop = [sample_params(space) for _ in range(population)]
     history = []
+
+    # 병렬 평가: 폴드 전처리 결과를 메모리 맵 파일로 한 번만 만들고 워커는 복사 없이 연결
+    store, executor = None, None
+    if workers > 1:
+        store = FoldStore.build(X, y, preprocessor, kfold=kfold, random_state=RANDOM_STATE, root=tmp_dir)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(store,))
+        worker_threads = threads if threads > 0 else max(1, (os.cpu_count() or 1) // workers)
+
+    def evaluate(candidates):
+        if executor is None:
+            return [eval_params(params, X, y, preprocessor, kfold=kfold, scoring=scoring, threads=threads) + (params,)
+                    for params in candidates]
+        futures = [executor.submit(eval_candidate, params, scoring, worker_threads, RANDOM_STATE) for params in candidates]
+        return [f.result() + (params,) for f, params in zip(futures, candidates)]
+
+    try:
+        return _ga_loop(pop, space, history, evaluate, generations, population, elitism, cx_rate, mut_rate, scoring)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+            store.cleanup()
+
+
+def _ga_loop(pop, space, history, evaluate, generations, population, elitism, cx_rate, mut_rate, scoring):
     for g in range(generations):
-        fitness = []
-        for params in pop:
-            s, prauc, f1 = eval_params(params, X, y, preprocessor, kfold=kfold, scoring=scoring, threads=threads)
-            fitness.append((s, prauc, f1, params))
+        fitness = evaluate(pop)
         fitness.sort(key=lambda x: x[0], reverse=True)
         best = fitness[0]
         history.append({'gen': g, 'best_score': best[0], 'best_params': best[3]})
@@ -312,10 +419,7 @@ def ga_optimize(X, y, preprocessor, generations=20, population=36, elitism=2, cx
             new_pop.extend([c1, c2])
         pop = new_pop[:population]
     # 최종 평가 후 최고 파라미터 반환
-    final_fit = []
-    for params in pop:
-        s, prauc, f1 = eval_params(params, X, y, preprocessor, kfold=kfold, scoring=scoring, threads=threads)
-        final_fit.append((s, prauc, f1, params))
+    final_fit = evaluate(pop)
     final_fit.sort(key=lambda x: x[0], reverse=True)
     return final_fit[0][3], history
 
@@ -365,14 +469,58 @@ def train_best_model(train_df, test_df, target, id_col, pre, best_params, thread
     return pipe, proba, pred, y_te, metrics
 
 
-def save_plots(y_true, proba, outdir):
+def binned_curves(y_true, proba, n_bins=1000):
+    """
+    점수 히스토그램(고정 그리드) 기반 PR/ROC 곡선 근사 → 테스트 행 수와 무관하게 최대 n_bins 개 점
+    Returns:
+        (곡선 점 DataFrame[threshold, precision, recall, fpr, tpr], 근사 오차 dict)
+    """
+    y = np.asarray(y_true).astype(bool)
+    proba = np.asarray(proba, dtype=np.float64)
+    idx = np.clip((proba * n_bins).astype(np.int64), 0, n_bins - 1)
+    # 높은 점수 구간부터 누적 → 임계값(구간 하한) 이상을 양성으로 예측
+    pos = np.bincount(idx[y], minlength=n_bins)[::-1]
+    neg = np.bincount(idx[~y], minlength=n_bins)[::-1]
+    keep = (pos + neg) > 0
+    tp, fp = np.cumsum(pos)[keep], np.cumsum(neg)[keep]
+    thresholds = (np.arange(n_bins)[::-1] / n_bins)[keep]
+    n_pos, n_neg = max(1, int(y.sum())), max(1, int((~y).sum()))
+    points = pd.DataFrame({
+        'threshold': thresholds,
+        'precision': tp / np.maximum(tp + fp, 1),
+        'recall': tp / n_pos,
+        'fpr': fp / n_neg,
+        'tpr': tp / n_pos,
+    })
+
+    recall_prev = np.concatenate([[0.0], points['recall'].values[:-1]])
+    ap_binned = float(np.sum((points['recall'].values - recall_prev) * points['precision'].values))
+    tpr = np.concatenate([[0.0], points['tpr'].values])
+    fpr = np.concatenate([[0.0], points['fpr'].values])
+    auc_binned = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    ap, auc = float(average_precision_score(y, proba)), float(roc_auc_score(y, proba))
+    approx = {
+        'n_bins': n_bins,
+        'n_points': int(len(points)),
+        'ap_exact': ap, 'ap_binned': ap_binned, 'ap_abs_error': abs(ap - ap_binned),
+        'auc_exact': auc, 'auc_binned': auc_binned, 'auc_abs_error': abs(auc - auc_binned),
+    }
+    return points, approx
+
+
+def save_plots(y_true, proba, outdir, n_bins=1000):
     import matplotlib.pyplot as plt
 
+    # 고정 그리드로 다운샘플링한 곡선 점 저장(대시보드 재사용) + 근사 오차 계산
+    points, approx = binned_curves(y_true, proba, n_bins=n_bins)
+    points_path = os.path.join(outdir, 'curve_points.csv')
+    points.to_csv(points_path, index=False)
+
     # PR curve
-    precision, recall, _ = precision_recall_curve(y_true, proba)
-    ap = average_precision_score(y_true, proba)
+    ap = approx['ap_exact']
     plt.figure()
-    plt.step(recall, precision, where='post')
+    plt.step(np.concatenate([[0.0], points['recall'].values]),
+             np.concatenate([[1.0], points['precision'].values]), where='post')
     plt.xlabel('Recall')
     plt.ylabel('Precision')
     plt.title(f'Precision-Recall Curve (AP={ap:.3f})')
@@ -381,10 +529,9 @@ def save_plots(y_true, proba, outdir):
     plt.close()
 
     # ROC curve
-    fpr, tpr, _ = roc_curve(y_true, proba)
-    auc = roc_auc_score(y_true, proba)
+    auc = approx['auc_exact']
     plt.figure()
-    plt.plot(fpr, tpr)
+    plt.plot(np.concatenate([[0.0], points['fpr'].values]), np.concatenate([[0.0], points['tpr'].values]))
     plt.plot([0,1],[0,1],'--')
     plt.xlabel('False Positive Rate')
     plt.ylabel('True Positive Rate')
@@ -393,7 +540,7 @@ def save_plots(y_true, proba, outdir):
     plt.savefig(roc_path, bbox_inches='tight', dpi=150)
     plt.close()
 
-    return pr_path, roc_path
+    return pr_path, roc_path, points_path, approx
 
 
 def save_confusion_matrix(y_true, y_pred, outdir):
@@ -419,41 +566,173 @@ def save_confusion_matrix(y_true, y_pred, outdir):
 
 
 def save_feature_importance(pipeline, outdir):
-    # XGB의 gain 기반 중요도 저장 (전처리 후 피처명 복원은 간단화)
+    # XGB 분할 빈도(weight) 기반 중요도 저장: f0,f1... → 원본 피처명으로 복원, 원-핫 컬럼은 원본 피처로 합산
     clf: XGBClassifier = pipeline.named_steps['clf']
     booster = clf.get_booster()
     fmap = booster.get_fscore()
-    # 키가 f0,f1... 형식 → 정렬
-    items = sorted(fmap.items(), key=lambda kv: kv[1], reverse=True)
+    col_to_feature = {}
+    for name, idx in feature_groups(pipeline.named_steps['pre']):
+        for i in idx:
+            col_to_feature[f'f{i}'] = name
+    totals = {}
+    for k, v in fmap.items():
+        name = col_to_feature.get(k, k)
+        totals[name] = totals.get(name, 0.0) + v
+    items = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
     fi_df = pd.DataFrame(items, columns=['feature','importance'])
     fi_path = os.path.join(outdir, 'feature_importance_xgb.csv')
     fi_df.to_csv(fi_path, index=False)
     return fi_path
 
 
-def save_shap_reports(pipeline, X_sample, outdir):
+def save_permutation_importance(pipeline, X, y_true, outdir, n_repeats=3, workers=0):
+    """
+    테스트셋 기준 원본 피처 단위 순열 중요도(PR-AUC 하락량)를 병렬 계산해 CSV 저장
+    """
+    pre = pipeline.named_steps['pre']
+    X_trans = pre.transform(X)
+    perm_df = permutation_importance(
+        pipeline.named_steps['clf'].get_booster(), X_trans, np.asarray(y_true), feature_groups(pre),
+        n_repeats=n_repeats, workers=workers, random_state=RANDOM_STATE, tmp_dir=outdir)
+    perm_path = os.path.join(outdir, 'permutation_importance.csv')
+    perm_df.to_csv(perm_path, index=False)
+    return perm_path
+
+
+def compute_shap_contribs(pipeline, X, batch_size=50000, threads=0):
+    """
+    XGBoost 내장 TreeSHAP(Booster.predict(pred_contribs=True), 멀티스레드 C++)을 배치 단위로 계산
+    Returns:
+        (전처리 후 피처별 mean |SHAP| 배열, 기댓값(bias), 첫 배치의 (X_trans, contribs))
+    """
+    import xgboost as xgb
+    pre = pipeline.named_steps['pre']
+    booster = pipeline.named_steps['clf'].get_booster()
+    if threads:
+        # 모델 저장 등과 동시에 실행되므로 원본 Booster 설정은 변경하지 않음
+        booster = booster.copy()
+        booster.set_param({'nthread': threads})
+    abs_sum, n, first = None, 0, None
+    for start in range(0, len(X), batch_size):
+        X_trans = np.asarray(pre.transform(X.iloc[start:start + batch_size]), dtype=np.float32)
+        contribs = booster.predict(xgb.DMatrix(X_trans), pred_contribs=True)
+        batch_abs = np.abs(contribs[:, :-1]).sum(axis=0)
+        abs_sum = batch_abs if abs_sum is None else abs_sum + batch_abs
+        n += len(X_trans)
+        if first is None:
+            first = (X_trans, contribs)
+    return abs_sum / max(1, n), float(first[1][0, -1]), first
+
+
+def save_shap_reports(pipeline, X, outdir, plot_rows=2000, threads=0):
+    """
+    전체 테스트셋 SHAP 집계(원본 피처 단위 mean |SHAP|) CSV 저장 + (shap 설치 시) 요약/워터폴 플롯
+    """
+    try:
+        mean_abs, base_value, (X_trans, contribs) = compute_shap_contribs(pipeline, X, threads=threads)
+        groups = feature_groups(pipeline.named_steps['pre'])
+        agg = pd.DataFrame(
+            [(name, float(mean_abs[idx].sum())) for name, idx in groups],
+            columns=['feature', 'mean_abs_shap']).sort_values('mean_abs_shap', ascending=False)
+        agg_path = os.path.join(outdir, 'shap_importance.csv')
+        agg.to_csv(agg_path, index=False)
+    except Exception as e:
+        warnings.warn(f"SHAP 계산 중 오류: {e}")
+        return None, None, None
+
     if not _HAS_SHAP:
-        return None, None
+        return None, None, agg_path
     try:
-        explainer = shap.TreeExplainer(pipeline.named_steps['clf'])
-        # 전처리 적용 후 SHAP 값을 계산해야 하므로, 전처리 변환행렬에 대해 계산
-        X_trans = pipeline.named_steps['pre'].transform(X_sample)
-        shap_values = explainer.shap_values(X_trans)
+        import matplotlib.pyplot as plt
+        feature_names = list(pipeline.named_steps['pre'].get_feature_names_out())
+        values = contribs[:plot_rows, :-1]
         # 요약 플롯
-        shap.summary_plot(shap_values, X_trans, show=False)
+        shap.summary_plot(values, X_trans[:plot_rows], feature_names=feature_names, show=False)
         sum_path = os.path.join(outdir, 'shap_summary.png')
-        import matplotlib.pyplot as plt
         plt.savefig(sum_path, bbox_inches='tight', dpi=150)
         plt.close()
         # 첫 샘플 waterfall
-        shap.plots._waterfall.waterfall_legacy(explainer.expected_value, shap_values[0], show=False)
+        shap.plots._waterfall.waterfall_legacy(base_value, values[0], feature_names=feature_names, show=False)
         wf_path = os.path.join(outdir, 'shap_waterfall_sample0.png')
         plt.savefig(wf_path, bbox_inches='tight', dpi=150)
         plt.close()
-        return sum_path, wf_path
+        return sum_path, wf_path, agg_path
     except Exception as e:
         warnings.warn(f"SHAP 리포트 생성 중 오류: {e}")
-        return None, None
+        return None, None, agg_path
+
+
+def _init_artifact_worker():
+    # 리포트 워커(및 메인 프로세스)는 GUI 없는 Agg 백엔드로 렌더링
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def start_artifact_jobs(mode, pipeline, y_true, proba, pred, X_test, outdir, threads=0, curve_bins=1000,
+                        perm_repeats=3, perm_workers=0):
+    """
+    서로 독립적인 리포트 작업을 백그라운드로 시작
+    - PNG 렌더링(PR/ROC, 혼동행렬): 프로세스 풀
+    - FI CSV, SHAP(XGBoost C++ 계산이 GIL 해제), 순열 중요도(자체 워커 프로세스 사용): 스레드
+    Returns:
+        ({작업명: future}, [executor...])
+    """
+    jobs, executors = {}, []
+    if mode == 'none':
+        return jobs, executors
+    if mode == 'full':
+        _init_artifact_worker()
+        # 스레드 작업(XGBoost/OpenMP) 시작 전에 만들고, 락을 물려받지 않도록 fork 대신 spawn
+        proc_ex = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn'),
+                                      initializer=_init_artifact_worker)
+        executors.append(proc_ex)
+        jobs['curves'] = proc_ex.submit(save_plots, y_true, proba, outdir, n_bins=curve_bins)
+        jobs['cm'] = proc_ex.submit(save_confusion_matrix, y_true, pred, outdir)
+    thread_ex = ThreadPoolExecutor(max_workers=3)
+    executors.append(thread_ex)
+    jobs['fi'] = thread_ex.submit(save_feature_importance, pipeline, outdir)
+    if mode == 'full':
+        jobs['shap'] = thread_ex.submit(save_shap_reports, pipeline, X_test, outdir, threads=threads)
+        if perm_repeats > 0:
+            jobs['perm'] = thread_ex.submit(save_permutation_importance, pipeline, X_test, y_true, outdir,
+                                            n_repeats=perm_repeats, workers=perm_workers)
+    return jobs, executors
+
+
+def collect_artifact_jobs(jobs, executors):
+    """
+    백그라운드 리포트 결과 수집 (실패한 작업은 경고 후 None)
+    Returns:
+        (아티팩트 경로 dict, 곡선 근사 오차 dict 또는 None)
+    """
+    def result(name, default):
+        if name not in jobs:
+            return default
+        try:
+            return jobs[name].result()
+        except Exception as e:
+            warnings.warn(f"리포트 작업 '{name}' 실패: {e}")
+            return default
+    try:
+        pr_path, roc_path, points_path, curve_approx = result('curves', (None, None, None, None))
+        cm_path = result('cm', None)
+        fi_path = result('fi', None)
+        perm_path = result('perm', None)
+        shap_sum, shap_wf, shap_agg = result('shap', (None, None, None))
+    finally:
+        for ex in executors:
+            ex.shutdown(wait=True)
+    return {
+        'PR Curve': pr_path,
+        'ROC Curve': roc_path,
+        'Curve Points (CSV)': points_path,
+        'Confusion Matrix': cm_path,
+        'Feature Importance (CSV)': fi_path,
+        'Permutation Importance (CSV)': perm_path,
+        'SHAP Summary': shap_sum,
+        'SHAP Waterfall(sample0)': shap_wf,
+        'SHAP Importance (CSV)': shap_agg,
+    }, curve_approx
 
 
 def generate_markdown_report(outdir, args, metrics, k_prec, k_rec, paths, best_params, classif_report):
@@ -485,7 +764,7 @@ def main():
     os.makedirs(args.outdir, exist_ok=True)
 
     # DB에서 데이터 로드
-    df = load_data_from_db(args.table)
+    df, load_stats = load_data_from_db(args.table, args)
     assert args.target in df.columns, f"타깃 컬럼 {args.target} 이(가) 존재하지 않습니다."
 
     # 날짜 컬럼 파싱(있다면)
@@ -500,14 +779,19 @@ def main():
     pre, num_cols, cat_cols = build_preprocessor(train_df, target=args.target, id_col=args.id_col)
 
     # GA 최적화(학습 데이터만 사용)
-    X_train = train_df.drop(columns=[args.target] + ([args.id_col] if args.id_col and args.id_col in train_df.columns else []))
-    y_train = train_df[args.target]
+    tune_df, tune_load_stats = train_df, None
+    if args.tune_sample < 1.0:
+        tune_df, tune_load_stats = tuning_sample(train_df, args.target, args.tune_sample, seed=args.sample_seed)
+
+    X_train = tune_df.drop(columns=[args.target] + ([args.id_col] if args.id_col and args.id_col in tune_df.columns else []))
+    y_train = tune_df[args.target]
 
     best_params, history = ga_optimize(
         X_train, y_train, preprocessor=pre,
         generations=args.generations, population=args.population, elitism=args.elitism,
         cx_rate=args.cx_rate, mut_rate=args.mut_rate, kfold=args.kfold,
-        scoring=args.scoring, threads=args.threads)
+        scoring=args.scoring, threads=args.threads,
+        workers=args.workers, tmp_dir=args.outdir)
 
     with open(os.path.join(args.outdir, 'ga_history.json'), 'w', encoding='utf-8') as fp:
         json.dump(history, fp, ensure_ascii=False, indent=2)
@@ -523,38 +807,72 @@ def main():
     # 분류 리포트
     clf_rep = classification_report(y_true, pred, digits=4)
 
-    # 아티팩트 저장
+    # 리포트(PR/ROC, 혼동행렬, FI, SHAP)는 백그라운드에서 병렬 생성
+    # (SHAP: 전체 테스트셋 집계, 플롯은 앞부분 2k 행)
+    X_test = test_df.drop(columns=[args.target] + ([args.id_col] if args.id_col and args.id_col in test_df.columns else []))
+    jobs, executors = start_artifact_jobs(args.artifacts, pipeline, y_true, proba, pred, X_test, args.outdir,
+                                          threads=args.threads, curve_bins=args.curve_bins,
+                                          perm_repeats=args.perm_repeats, perm_workers=args.perm_workers)
+
+    # 그동안 모델 저장 + DB 기록
     import joblib
+    model_version = datetime.now().strftime('%Y%m%d_%H%M%S')
     model_path = os.path.join(args.outdir, 'model_pipeline.joblib')
     joblib.dump(pipeline, model_path)
 
-    pr_path, roc_path = save_plots(y_true, proba, args.outdir)
-    cm_path = save_confusion_matrix(y_true, pred, args.outdir)
-    fi_path = save_feature_importance(pipeline, args.outdir)
+    # 고속 스코어러(컴파일된 전처리 + Booster) 저장, 원본 대비 오차 검증
+    fast_scorer_path, fast_scorer_err = export_fast_scorer(
+        pipeline, os.path.join(args.outdir, 'fast_scorer.joblib'),
+        X_check=X_test.head(1000))
 
-    # SHAP 리포트(샘플 2k 제한)
-    shap_sum, shap_wf = None, None
-    try:
-        X_sample = train_df.drop(columns=[args.target] + ([args.id_col] if args.id_col and args.id_col in train_df.columns else [])).sample(n=min(2000, len(train_df)), random_state=RANDOM_STATE)
-        shap_sum, shap_wf = save_shap_reports(pipeline, X_sample, args.outdir)
-    except Exception as e:
-        warnings.warn(f"SHAP 샘플링/저장 실패: {e}")
-
-    paths = {
-        'PR Curve': pr_path,
-        'ROC Curve': roc_path,
-        'Confusion Matrix': cm_path,
-        'Feature Importance (CSV)': fi_path,
-        'SHAP Summary': shap_sum,
-        'SHAP Waterfall(sample0)': shap_wf,
-        'Model Pipeline': model_path,
-        'GA History': os.path.join(args.outdir, 'ga_history.json')
+    # 콘텐츠 주소 저장소에 압축 모델 저장 → DB에는 다음 실행이 덮어쓰지 않는 불변 경로 기록
+    store = ArtifactStore(os.path.join(args.outdir, 'store'))
+    store_entries = {
+        'Model Pipeline': store.put_object(pipeline),
+        'Fast Scorer': store.put_file(fast_scorer_path),
     }
+    # DB 기록이 가리키는 매니페스트는 기록 전에 먼저 작성 (리포트 항목은 마지막에 추가해 다시 기록)
+    manifest_extra = {'metrics': metrics, 'best_params': best_params}
+    manifest_path = store.write_manifest(model_version, store_entries, extra=manifest_extra)
 
-    report_md = generate_markdown_report(args.outdir, args, metrics, pk, rk, paths, best_params, clf_rep)
+    report_md = os.path.join(args.outdir, 'report.md') if args.artifacts != 'none' else None
 
     # DB에 모델 성능 저장
-    save_model_performance_to_db(metrics, best_params, model_path, report_md, args)
+    save_model_performance_to_db(metrics, best_params, store_entries['Model Pipeline']['path'], report_md, args,
+                                 model_version=model_version, manifest_path=manifest_path)
+
+    paths, curve_approx = collect_artifact_jobs(jobs, executors)
+    paths.update({
+        'Model Pipeline': model_path,
+        'Fast Scorer': fast_scorer_path,
+        'GA History': os.path.join(args.outdir, 'ga_history.json')
+    })
+
+    if report_md:
+        report_md = generate_markdown_report(args.outdir, args, metrics, pk, rk, paths, best_params, clf_rep)
+
+    # 서빙 비용 벤치마크 (저장된 파이프라인 기준, 새 프로세스에서 측정) → report.md 가 있으면 추가
+    bench_path = None
+    if not args.skip_benchmark:
+        out_path = os.path.join(args.outdir, 'serving_benchmark.json')
+        cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_scoring.py'),
+               '--model', model_path, '--out', out_path, '--model_version', model_version,
+               '--batch_sizes', ','.join(str(b) for b in DEFAULT_BATCH_SIZES if b <= args.bench_max_batch),
+               '--iters', str(args.bench_iters),
+               '--numeric_features', ','.join(num_cols), '--categorical_features', ','.join(cat_cols)]
+        if fast_scorer_path:
+            cmd += ['--fast_scorer', fast_scorer_path]
+        if report_md:
+            cmd += ['--report', report_md]
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode == 0:
+                bench_path = out_path
+                paths['Serving Benchmark (JSON)'] = bench_path
+            else:
+                warnings.warn(f"서빙 벤치마크 실패: {proc.stderr.strip()[-2000:]}")
+        except Exception as e:
+            warnings.warn(f"서빙 벤치마크 실패: {e}")
 
     # 메타 정보 저장
     meta = {
@@ -565,12 +883,28 @@ def main():
         'best_params': best_params,
         'artifacts': paths,
         'report_md': report_md,
+        'fast_scorer_max_abs_diff': fast_scorer_err,
+        'load_stats': load_stats,
+        'tune_load_stats': tune_load_stats,
+        'curve_approx': curve_approx,
+        'serving_benchmark': bench_path,
+        'model_version': model_version,
+        'manifest_path': manifest_path,
         'numeric_features': num_cols,
         'categorical_features': cat_cols
     }
-    with open(os.path.join(args.outdir, 'run_meta.json'), 'w', encoding='utf-8') as fp:
+    meta_path = os.path.join(args.outdir, 'run_meta.json')
+    with open(meta_path, 'w', encoding='utf-8') as fp:
         json.dump(meta, fp, ensure_ascii=False, indent=2)
 
+    # 나머지 아티팩트도 저장소에 등록(변경 없는 파일은 중복 저장 안 함) 후 실행별 매니페스트 기록
+    extra_files = dict(paths)
+    extra_files.update({'Report': report_md, 'Run Meta': meta_path})
+    for name, p in extra_files.items():
+        if p and name not in store_entries and os.path.exists(p):
+            store_entries[name] = store.put_file(p)
+    store.write_manifest(model_version, store_entries, extra=manifest_extra)
+
     print("=== 완료 ===")
     print(json.dumps({'metrics': metrics, 'precision_at_k': pk, 'recall_at_k': rk, 'best_params': best_params, 'report': report_md}, ensure_ascii=False, indent=2))
 
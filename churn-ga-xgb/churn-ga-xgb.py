@@ -129,7 +129,7 @@ def save_model_performance_to_db(metrics, best_params, model_path, report_path,
         
         with engine.connect() as conn:
             conn.execute(text("""
-                INSERT INTO ml_model_performance (
+                INSERT INTO ml.ml_model_performance (
                     model_name, model_version, test_size, kfold,
                     roc_auc, pr_auc, f1_score, precision_score, recall_score, brier_score,
                     precision_at_k, recall_at_k, best_params, model_path, report_path
@@ -160,7 +160,8 @@ def save_model_performance_to_db(metrics, best_params, model_path, report_path,
         print("✅ 모델 성능이 DB에 저장되었습니다.")
         
     except Exception as e:
-        print(f"❌ DB 저장 오류: {str(e)}")
+        # 레지스트리(백엔드)는 이 기록으로 새 모델을 찾으므로 실패를 드러냄
+        warnings.warn(f"모델 성능 DB 저장 실패 (백엔드 레지스트리에 반영되지 않음): {str(e)}")
 
 
 def split_train_test(df, target, date_col=None, test_size=0.2):
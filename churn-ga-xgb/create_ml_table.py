@@ -3,6 +3,7 @@
 ML 서비스를 위한 테이블 생성 및 샘플 데이터 삽입 스크립트
 """
 
+import argparse
 import psycopg2
 import pandas as pd
 import numpy as np
@@ -18,17 +19,21 @@ DB_CONFIG = {
     'password': 'retention_password'
 }
 
-def create_ml_table():
-    """ML 학습용 테이블 생성"""
+def create_ml_table(rebuild=False):
+    """ML 학습용 테이블 생성 (rebuild=True 일 때만 기존 테이블 삭제 후 재생성)"""
     conn = psycopg2.connect(**DB_CONFIG)
     cursor = conn.cursor()
     
-    # 기존 테이블이 있으면 삭제
-    cursor.execute("DROP TABLE IF EXISTS ml.ml_training_data")
+    # 기존 테이블/인덱스와 적재 워터마크는 유지하고, 재구축 요청 시에만 삭제
+    if rebuild:
+        cursor.execute("DROP TABLE IF EXISTS ml.ml_training_data")
+        cursor.execute("SELECT to_regclass('ml.ml_load_watermarks') IS NOT NULL")
+        if cursor.fetchone()[0]:
+            cursor.execute("DELETE FROM ml.ml_load_watermarks WHERE table_name = 'ml.ml_training_data'")
     
     # ML 학습용 테이블 생성
     create_table_sql = """
-    CREATE TABLE ml.ml_training_data (
+    CREATE TABLE IF NOT EXISTS ml.ml_training_data (
         id SERIAL PRIMARY KEY,
         customer_id VARCHAR(50),
         age INTEGER,
@@ -52,24 +57,28 @@ def create_ml_table():
     );
     """
     
+    cursor.execute("CREATE SCHEMA IF NOT EXISTS ml")
     cursor.execute(create_table_sql)
     conn.commit()
-    print("ML 학습용 테이블이 생성되었습니다.")
+    print("ML 학습용 테이블이 준비되었습니다.")
     
     cursor.close()
     conn.close()
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description="ML 학습용 테이블 준비")
+    parser.add_argument('--rebuild', action='store_true', help='기존 테이블을 삭제하고 재생성')
+    args = parser.parse_args()
+
     print("ML 서비스용 테이블 및 데이터 준비를 시작합니다...")
     
     # 테이블 생성
-    create_ml_table()
+    create_ml_table(rebuild=args.rebuild)
     
     print("ML 서비스 준비가 완료되었습니다!")
     print(f"- 테이블명: ml_training_data")
     print(f"- 타겟 컬럼: EverDelinquent")
-    print(f"- 데이터 수: {len(df)}개")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+학습 테이블 스트리밍 로더
+-----------------------------------------------------------------
+- 서버 사이드(named) 커서 + fetchmany(chunksize)로 결과를 청크 단위 수신
+- 컬럼 타입(OID) 기반 명시적 dtype 맵, 미리 할당한 NumPy 배열에 직접 채움
+- data_schema.yaml / feature_dictionary.csv 에 정의된 피처로 컬럼 투영(projection)
+  → 최대 메모리가 최종 DataFrame 크기 수준으로 유지
+- COPY (SELECT ...) TO STDOUT 결과를 파이프로 pyarrow/pandas CSV 파서에 직접 전달하는 고속 경로
+- 테이블 스냅샷 캐시(Arrow IPC): 행 수/max(created_at)/변경 카운터/적재 파일 해시/컬럼 목록 키가 같으면 재사용
+"""
+
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# PostgreSQL 타입 OID → NumPy dtype
+_INT_OIDS = {20, 21, 23}          # int8, int2, int4
+_FLOAT_OIDS = {700, 701, 1700}    # float4, float8, numeric
+_BOOL_OIDS = {16}
+
+
+def load_schema_features(schema_path=None, dictionary_path=None):
+    """data_schema.yaml / feature_dictionary.csv 에 정의된 피처 컬럼명 집합 반환 (없으면 빈 집합)"""
+    names = set()
+    if schema_path and os.path.exists(schema_path):
+        import yaml
+        with open(schema_path, encoding='utf-8') as f:
+            schema = yaml.safe_load(f) or {}
+        for cols in (schema.get('features') or {}).values():
+            names.update(cols or [])
+    if dictionary_path and os.path.exists(dictionary_path):
+        with open(dictionary_path, encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                if row.get('role') == 'feature':
+                    names.add(row['feature_name'])
+    return {n.lower() for n in names}
+
+
+def describe_table(conn, table_name):
+    """LIMIT 0 조회로 (컬럼명, 타입 OID) 목록 반환"""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT * FROM {table_name} LIMIT 0")
+        return [(d.name, d.type_code) for d in cur.description]
+
+
+def project_columns(table_cols, wanted, required=()):
+    """
+    테이블 컬럼 중 스키마에 정의된 피처 + 필수 컬럼(타깃/ID/날짜)만 선택
+    (스키마와 겹치는 피처가 없으면 전체 컬럼 사용)
+    """
+    required = {c.lower() for c in required if c}
+    selected = [c for c in table_cols if c.lower() in wanted or c.lower() in required]
+    if not any(c.lower() in wanted for c in selected):
+        print("⚠️ 스키마 정의와 일치하는 피처가 없어 전체 컬럼을 로드합니다.")
+        return list(table_cols)
+    return selected
+
+
+def _dtype_for(oid):
+    # 정수/불리언도 NULL(NaN) 표현을 위해 float로 채운 뒤, 결측이 없는 정수 컬럼만 마지막에 변환
+    if oid in _INT_OIDS or oid in _FLOAT_OIDS or oid in _BOOL_OIDS:
+        return np.float64
+    return object
+
+
+def read_table_streaming(raw_conn, table_name, columns=None, chunksize=50000, where=None):
+    """
+    서버 사이드 커서로 테이블을 청크 단위로 읽어 미리 할당한 배열에 채운 DataFrame 반환
+
+    Args:
+        raw_conn: psycopg2 커넥션 (engine.raw_connection())
+        table_name (str): 테이블명
+        columns (list): 로드할 컬럼 (None이면 전체)
+        chunksize (int): fetchmany 크기
+        where (str): 추가 WHERE 절 (선택)
+    """
+    described = dict(describe_table(raw_conn, table_name))
+    columns = list(columns) if columns else list(described)
+    col_sql = ", ".join(f'"{c}"' for c in columns)
+    where_sql = f" WHERE {where}" if where else ""
+
+    with raw_conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM {table_name}{where_sql}")
+        n_rows = cur.fetchone()[0]
+
+    oids = [described[c] for c in columns]
+    arrays = [np.empty(n_rows, dtype=_dtype_for(oid)) for oid in oids]
+
+    filled = 0
+    # named 커서 → 서버 측에서 결과를 보관하고 chunksize 단위로 전송
+    with raw_conn.cursor(name=f"ml_stream_{uuid.uuid4().hex[:8]}") as cur:
+        cur.itersize = chunksize
+        cur.execute(f"SELECT {col_sql} FROM {table_name}{where_sql}")
+        while True:
+            rows = cur.fetchmany(chunksize)
+            if not rows:
+                break
+            end = min(filled + len(rows), n_rows)
+            rows = rows[:end - filled]  # COUNT 이후 삽입된 행은 무시
+            for j, values in enumerate(zip(*rows)):
+                if arrays[j].dtype == object:
+                    arrays[j][filled:end] = values
+                else:
+                    arrays[j][filled:end] = [np.nan if v is None else v for v in values]
+            filled = end
+            if filled >= n_rows:
+                break
+    raw_conn.commit()
+
+    data = {}
+    for col, oid, arr in zip(columns, oids, arrays):
+        arr = arr[:filled]
+        if oid in _INT_OIDS and not np.isnan(arr).any():
+            arr = arr.astype(np.int64)
+        data[col] = arr
+    return pd.DataFrame(data, copy=False)
+
+
+def _arrow_column_types(columns, oids):
+    import pyarrow as pa
+    types = {}
+    for col, oid in zip(columns, oids):
+        if oid in _INT_OIDS:
+            types[col] = pa.int64()
+        elif oid in _FLOAT_OIDS:
+            types[col] = pa.float64()
+        elif oid in _BOOL_OIDS:
+            types[col] = pa.bool_()
+        elif oid in (25, 1042, 1043):   # text, bpchar, varchar
+            types[col] = pa.string()
+    return types
+
+
+class _CountingWriter:
+    """COPY 출력 바이트 수를 세면서 파이프에 기록"""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.nbytes = 0
+
+    def write(self, data):
+        self.nbytes += len(data)
+        return self.fp.write(data)
+
+
+def read_table_copy(raw_conn, table_name, columns=None, where=None):
+    """
+    COPY (SELECT ...) TO STDOUT (CSV) 결과를 OS 파이프로 CSV 파서에 스트리밍
+
+    Returns:
+        (DataFrame, 전송 바이트 수)
+    """
+    described = dict(describe_table(raw_conn, table_name))
+    columns = list(columns) if columns else list(described)
+    oids = [described[c] for c in columns]
+    col_sql = ", ".join(f'"{c}"' for c in columns)
+    where_sql = f" WHERE {where}" if where else ""
+    copy_sql = f"COPY (SELECT {col_sql} FROM {table_name}{where_sql}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+
+    r_fd, w_fd = os.pipe()
+    reader = os.fdopen(r_fd, 'rb')
+    writer = _CountingWriter(os.fdopen(w_fd, 'wb'))
+    errors = []
+
+    def produce():
+        try:
+            with raw_conn.cursor() as cur:
+                cur.copy_expert(copy_sql, writer)
+        except Exception as e:  # 권한 부족 등 → 호출 측에서 폴백
+            errors.append(e)
+        finally:
+            writer.fp.close()
+
+    t = threading.Thread(target=produce, daemon=True)
+    t.start()
+    try:
+        try:
+            import pyarrow.csv as pacsv
+            # PostgreSQL CSV: boolean 은 t/f, NULL 은 빈 값 → 커서 경로와 같은 dtype/결측 처리
+            table = pacsv.read_csv(
+                reader,
+                convert_options=pacsv.ConvertOptions(
+                    column_types=_arrow_column_types(columns, oids),
+                    true_values=['t'],
+                    false_values=['f'],
+                    strings_can_be_null=True))
+            df = table.to_pandas()
+        except ImportError:
+            df = pd.read_csv(reader, true_values=['t'], false_values=['f'])
+    except Exception:
+        if errors:
+            raise errors[0]
+        raise
+    finally:
+        reader.close()
+        t.join()
+    if errors:
+        raise errors[0]
+    raw_conn.commit()
+    return df, writer.nbytes
+
+
+def load_table(raw_conn, table_name, columns=None, method='copy', chunksize=50000, where=None):
+    """
+    COPY 고속 경로로 로드하고, COPY가 허용되지 않으면 서버 사이드 커서 스트리밍으로 폴백
+
+    Returns:
+        (DataFrame, 로드 통계 dict: method, bytes, seconds, mb_per_s)
+    """
+    start = time.perf_counter()
+    df, nbytes = None, None
+    if method == 'copy':
+        try:
+            df, nbytes = read_table_copy(raw_conn, table_name, columns=columns, where=where)
+        except Exception as e:
+            warnings.warn(f"COPY 로드 실패, 커서 스트리밍으로 전환합니다: {e}")
+            raw_conn.rollback()
+            method = 'stream'
+    if df is None:
+        df = read_table_streaming(raw_conn, table_name, columns=columns, chunksize=chunksize, where=where)
+        # 커서 경로는 와이어 바이트를 알 수 없어 메모리상 프레임 크기로 대체
+        nbytes = int(df.memory_usage(deep=True).sum())
+    seconds = time.perf_counter() - start
+    stats = {
+        'method': method,
+        'rows': int(len(df)),
+        'bytes': int(nbytes),
+        'seconds': round(seconds, 3),
+        'mb_per_s': round(nbytes / 1e6 / seconds, 2) if seconds > 0 else None,
+    }
+    return df, stats
+
+
+def snapshot_key(raw_conn, table_name, columns, date_col='created_at'):
+    """
+    스냅샷 유효성 키 계산 (테이블명, 행 수, max(created_at), 변경 카운터, 적재 파일 해시, 컬럼 목록)
+    - created_at 이 없는 테이블(CSV 적재 ml.ml_training_data 등)도 내용 변경을 감지하도록
+      pg_stat_user_tables 의 삽입/수정/삭제 누적 카운터와 ml_load_watermarks 의 파일 해시를 포함
+    """
+    table_cols = [c for c, _ in describe_table(raw_conn, table_name)]
+    max_expr = f'MAX("{date_col}")::text' if date_col in table_cols else 'NULL'
+    with raw_conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*), {max_expr} FROM {table_name}")
+        n_rows, max_ts = cur.fetchone()
+        cur.execute("""
+            SELECT n_tup_ins + n_tup_upd + n_tup_del
+            FROM pg_stat_user_tables WHERE relid = to_regclass(%s)
+        """, (table_name,))
+        row = cur.fetchone()
+        n_mod = int(row[0]) if row is not None else None
+        # search_path 기준으로 실제 스키마/정규화된 이름을 찾아 적재 워터마크(키: 'ml.ml_training_data')와 맞춤
+        file_hash = None
+        cur.execute("""
+            SELECT n.nspname, n.nspname || '.' || c.relname
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.oid = to_regclass(%s)
+        """, (table_name,))
+        row = cur.fetchone()
+        if row is not None:
+            schema, qualified = row
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f"{schema}.ml_load_watermarks",))
+            if cur.fetchone()[0]:
+                cur.execute(f"""
+                    SELECT file_hash || ':' || row_offset FROM {schema}.ml_load_watermarks WHERE table_name = %s
+                """, (qualified,))
+                row = cur.fetchone()
+                file_hash = row[0] if row is not None else None
+    raw_conn.commit()
+    key = {
+        'table': table_name,
+        'rows': int(n_rows),
+        'max_created_at': max_ts,
+        'n_mod': n_mod,
+        'load_file_hash': file_hash,
+        'columns': list(columns) if columns else table_cols,
+    }
+    key['hash'] = hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+    return key
+
+
+def _snapshot_paths(cache_dir, table_name):
+    base = os.path.join(cache_dir, table_name.replace('.', '__'))
+    return base + '.arrow', base + '.json'
+
+
+def read_snapshot(cache_dir, key):
+    """
+    키가 일치하는 스냅샷이 있으면 DataFrame 반환, 없으면 None
+    (IPC 파일은 역직렬화 없이 메모리 맵으로 읽지만 pandas 변환 시 복사됨 → 블록 분할로 변환 피크만 줄임)
+    """
+    data_path, meta_path = _snapshot_paths(cache_dir, key['table'])
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path, encoding='utf-8') as f:
+        if json.load(f).get('hash') != key['hash']:
+            return None
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    with pa.memory_map(data_path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def write_snapshot(cache_dir, key, df):
+    """DataFrame을 비압축 Arrow IPC 파일로 저장 (메모리 맵 가능), 실패 시 경고만 출력"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("⚠️ pyarrow가 없어 스냅샷 캐시를 저장하지 않습니다.")
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _snapshot_paths(cache_dir, key['table'])
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        tmp_path = data_path + '.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, data_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(key, f, ensure_ascii=False, indent=2, default=str)
+    except Exception as e:
+        print(f"⚠️ 스냅샷 캐시 저장 실패: {e}")
+        return None
+    return data_path
@@ -1,82 +1,370 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import hashlib
+import io
+import itertools
 import pandas as pd
 import psycopg2
 from sqlalchemy import create_engine, text
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 
+# Docker 네트워크 내에서의 데이터베이스 연결 설정
+DB_CONFIG = {
+    'host': 'postgres',  # Docker 서비스명
+    'port': 5432,
+    'database': 'retention_db',
+    'user': 'retention_user',
+    'password': 'retention_password'
+}
+
+
+def _pg_type(dtype):
+    """pandas dtype → PostgreSQL 컬럼 타입"""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'DOUBLE PRECISION'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'TIMESTAMP'
+    return 'TEXT'
+
+
+def _column_types(sample):
+    """
+    샘플로 추론한 컬럼별 PostgreSQL 타입 (샘플 밖의 값에도 적재가 깨지지 않도록 넓혀서 지정)
+    - 정수 → NUMERIC (뒤에 소수 값이 나와도 허용, 정수 값은 그대로 저장)
+    - 샘플에서 전부 결측인 컬럼 → TEXT
+    """
+    types = {}
+    for c, t in sample.dtypes.items():
+        if sample[c].isna().all():
+            types[c] = 'TEXT'
+        elif pd.api.types.is_integer_dtype(t):
+            types[c] = 'NUMERIC'
+        else:
+            types[c] = _pg_type(t)
+    return types
+
+
+def _create_table_sql(sample, qualified_name, unlogged=False):
+    cols = ",\n    ".join(f'"{c}" {t}' for c, t in _column_types(sample).items())
+    return f"CREATE {'UNLOGGED ' if unlogged else ''}TABLE {qualified_name} (\n    {cols}\n)"
+
+
+def _copy_frame(conn, df, qualified_name):
+    """DataFrame을 CSV로 직렬화해 COPY ... FROM STDIN으로 적재"""
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    columns = ", ".join(f'"{c}"' for c in df.columns)
+    with conn.cursor() as cur:
+        cur.copy_expert(f"COPY {qualified_name} ({columns}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+class _CopyWorkers:
+    """스레드별 전용 커넥션으로 프레임을 COPY (동시 진행 청크 수 = workers 로 제한)"""
+
+    def __init__(self, qualified_name, workers):
+        self.qualified_name = qualified_name
+        self.workers = max(1, workers)
+        self._local = threading.local()
+        self._conns = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._futures = []
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = psycopg2.connect(**DB_CONFIG)
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def _run(self, df):
+        try:
+            conn = self._conn()
+            _copy_frame(conn, df, self.qualified_name)
+            conn.commit()
+            return len(df)
+        finally:
+            self._slots.release()
+
+    def submit(self, df):
+        # 슬롯이 빌 때까지 대기 → 메모리에 올라가는 청크 수가 workers 개로 제한
+        self._slots.acquire()
+        self._futures.append(self._executor.submit(self._run, df))
+        # 완료된 future 정리 (예외는 즉시 전파)
+        done = [f for f in self._futures if f.done()]
+        for f in done:
+            f.result()
+            self._futures.remove(f)
+
+    def close(self):
+        try:
+            for f in self._futures:
+                f.result()
+        finally:
+            self._executor.shutdown(wait=True)
+            for conn in self._conns:
+                conn.close()
+
+
+def _read_sample(csv_file_path, sample_rows):
+    """
+    CSV 앞부분(sample_rows 행)만 읽어 스키마 추론용 DataFrame과 평균 행 바이트 수 반환
+    """
+    with open(csv_file_path, 'rb') as f:
+        lines = list(itertools.islice(f, sample_rows + 1))
+    raw = b''.join(lines)
+    sample = pd.read_csv(io.BytesIO(raw), encoding='utf-8')
+    avg_row_bytes = max(1, len(raw) // max(1, len(lines)))
+    return sample, avg_row_bytes
+
+
+def _iter_csv_chunks(csv_file_path, sample, chunk_rows, avg_row_bytes, offset=0):
+    """
+    샘플로 추론한 스키마로 CSV를 고정 크기 청크 단위로 읽음 (pyarrow 사용 가능 시 pyarrow 스트리밍 리더)
+    offset > 0 이면 해당 바이트 위치(행 경계)부터 헤더 없이 이어서 읽음
+    NUMERIC/TEXT 컬럼은 문자열 그대로 읽어 COPY 시 PostgreSQL 이 변환 (정수 → '1.0' 직렬화 방지)
+    """
+    pg_types = _column_types(sample)
+    dtypes = {c: {'BOOLEAN': 'boolean', 'DOUBLE PRECISION': 'float64'}.get(t, str) for c, t in pg_types.items()}
+    names = list(sample.columns)
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        pa = None
+    if pa is None:
+        with open(csv_file_path, 'rb') as f:
+            f.seek(offset)
+            if offset:
+                yield from pd.read_csv(f, encoding='utf-8', dtype=dtypes, chunksize=chunk_rows, header=None, names=names)
+            else:
+                yield from pd.read_csv(f, encoding='utf-8', dtype=dtypes, chunksize=chunk_rows)
+        return
+
+    arrow_types = {c: {'BOOLEAN': pa.bool_(), 'DOUBLE PRECISION': pa.float64()}.get(t, pa.string())
+                   for c, t in pg_types.items()}
+    read_options = pacsv.ReadOptions(block_size=int(chunk_rows * avg_row_bytes),
+                                     column_names=names if offset else None)
+    with open(csv_file_path, 'rb') as f:
+        f.seek(offset)
+        reader = pacsv.open_csv(
+            f, read_options=read_options,
+            convert_options=pacsv.ConvertOptions(column_types=arrow_types, strings_can_be_null=True))
+        for batch in reader:
+            yield batch.to_pandas()
+
+
+def _hash_file(csv_file_path, prefix_bytes=None):
+    """
+    파일 SHA-256 (전체) 및 앞 prefix_bytes 바이트의 SHA-256 을 한 번의 읽기로 계산
+    """
+    full = hashlib.sha256()
+    prefix_hash = None
+    read = 0
+    with open(csv_file_path, 'rb') as f:
+        while True:
+            block = f.read(1 << 20)
+            if prefix_bytes is not None and prefix_hash is None and read + len(block) >= prefix_bytes:
+                full.update(block[:prefix_bytes - read])
+                prefix_hash = full.hexdigest()
+                full.update(block[prefix_bytes - read:])
+            else:
+                full.update(block)
+            if not block:
+                break
+            read += len(block)
+    return full.hexdigest(), prefix_hash
+
+
+def _ensure_watermark_table(conn, schemas):
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA IF NOT EXISTS {schemas}")
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {schemas}.ml_load_watermarks (
+                table_name VARCHAR(200) PRIMARY KEY,
+                source_path TEXT,
+                byte_offset BIGINT NOT NULL,
+                row_offset BIGINT NOT NULL,
+                file_hash VARCHAR(64) NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    conn.commit()
+
+
+def _get_watermark(conn, schemas, qualified_name):
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT byte_offset, row_offset, file_hash, to_regclass(%s) IS NOT NULL
+            FROM {schemas}.ml_load_watermarks WHERE table_name = %s
+        """, (qualified_name, qualified_name))
+        row = cur.fetchone()
+    if row is None or not row[3]:
+        return None
+    if row[1] > 0:
+        # UNLOGGED 테이블은 비정상 종료 후 복구 시 비워짐 → 워터마크 무효
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT EXISTS (SELECT 1 FROM {qualified_name})")
+            if not cur.fetchone()[0]:
+                return None
+    return {'byte_offset': row[0], 'row_offset': row[1], 'file_hash': row[2]}
+
+
+def _set_watermark(cur, schemas, qualified_name, csv_file_path, byte_offset, row_offset, file_hash):
+    cur.execute(f"""
+        INSERT INTO {schemas}.ml_load_watermarks (table_name, source_path, byte_offset, row_offset, file_hash, updated_at)
+        VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (table_name) DO UPDATE SET
+            source_path = EXCLUDED.source_path,
+            byte_offset = EXCLUDED.byte_offset,
+            row_offset = EXCLUDED.row_offset,
+            file_hash = EXCLUDED.file_hash,
+            updated_at = EXCLUDED.updated_at
+    """, (qualified_name, csv_file_path, byte_offset, row_offset, file_hash))
+
+
+def _append_new_rows(conn, csv_file_path, schemas, qualified_name, sample, watermark, file_size, file_hash,
+                     chunk_rows, avg_row_bytes):
+    """
+    워터마크 이후 추가된 행만 기존 테이블에 COPY로 추가하고 워터마크를 같은 트랜잭션에서 갱신
+    (테이블/인덱스는 그대로 유지)
+    """
+    start = time.perf_counter()
+    appended = 0
+    try:
+        for chunk in _iter_csv_chunks(csv_file_path, sample, chunk_rows, avg_row_bytes, offset=watermark['byte_offset']):
+            _copy_frame(conn, chunk, qualified_name)
+            appended += len(chunk)
+        with conn.cursor() as cur:
+            _set_watermark(cur, schemas, qualified_name, csv_file_path, file_size,
+                           watermark['row_offset'] + appended, file_hash)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    print(f"증분 적재 완료: 신규 {appended:,} 행 (누적 {watermark['row_offset'] + appended:,} 행), "
+          f"{time.perf_counter() - start:.2f}초")
+    return appended
+
+
 # Kaffle CSV 파일 PostgreSQL DB 적재
-def load_data_to_db(csv_file_path, schemas='ml', table_name='ml_training_data'):
+def load_data_to_db(csv_file_path, schemas='ml', table_name='ml_training_data', workers=1,
+                    chunk_rows=100000, sample_rows=10000, mode='full'):
     """
+    CSV를 명시적 타입의 UNLOGGED 스테이징 테이블에 COPY FROM STDIN으로 적재한 뒤
+    한 트랜잭션에서 기존 테이블과 교체(atomic swap)
+
+    학습 테이블은 CSV에서 언제든 다시 만들 수 있으므로 교체 후에도 UNLOGGED 로 유지
+    (SET LOGGED 는 테이블 전체를 다시 쓰고 WAL 에 기록해 UNLOGGED 적재 이점을 없앰)
+    → DB 비정상 종료 시 테이블이 비워지며, 이 경우 다음 증분 적재는 전체 적재로 전환
+
+    스키마는 앞부분 샘플로 한 번만 추론하고, 본문은 chunk_rows 단위로 읽어 곧바로 COPY
+    → 파일 크기와 무관하게 최대 메모리는 약 workers x chunk_rows 행으로 제한
+
+    mode='incremental' 이면 ml_load_watermarks 의 워터마크(파일 해시 + 바이트/행 오프셋)를 확인해
+    이전 적재분이 그대로인 경우 뒤에 추가된 행만 기존 테이블에 추가 (DROP/재적재 없음)
+
     Args:
         csv_file_path (str): CSV 파일 경로
+        schemas (str): 스키마 이름
         table_name (str): 테이블 이름
+        workers (int): 병렬 COPY 워커 수 (청크 단위)
+        chunk_rows (int): 청크당 행 수
+        sample_rows (int): 스키마 추론용 샘플 행 수
+        mode (str): 'full'(전체 재적재) 또는 'incremental'(워터마크 기반 증분 적재)
     """
-    
-    # Docker 네트워크 내에서의 데이터베이스 연결 설정
-    DB_CONFIG = {
-        'host': 'postgres',  # Docker 서비스명
-        'port': 5432,
-        'database': 'retention_db',
-        'user': 'retention_user',
-        'password': 'retention_password'
-    }
-    
+    qualified = f"{schemas}.{table_name}"
+    staging = f"{table_name}__staging"
+    qualified_staging = f"{schemas}.{staging}"
+
+    conn = None
     try:
-        print(f"CSV 파일을 읽는 중: {csv_file_path}")
-        
-        # CSV 파일 읽기
-        df = pd.read_csv(csv_file_path, encoding='utf-8')
-        print(f"데이터 로드 완료: {len(df)} 행, {len(df.columns)} 컬럼")
+        print(f"CSV 스키마 추론 중 (샘플 {sample_rows:,}행): {csv_file_path}")
+        sample, avg_row_bytes = _read_sample(csv_file_path, sample_rows)
         
         # 컬럼 정보 출력
-        print("\n컬럼 정보:")
-        for i, col in enumerate(df.columns):
-            print(f"{i+1:2d}. {col} ({df[col].dtype})")
+        print(f"\n추론된 컬럼 정보 ({len(sample.columns)} 컬럼):")
+        pg_types = _column_types(sample)
+        for i, (col, dtype) in enumerate(sample.dtypes.items()):
+            print(f"{i+1:2d}. {col} ({dtype} → {pg_types[col]})")
         
         # 데이터베이스 연결
         print(f"\n데이터베이스에 연결 중...")
-        engine = create_engine(
-            f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
-        )
-        
-        # 기존 테이블이 있으면 삭제
-        with engine.connect() as conn:
-            conn.execute(text(f"DROP TABLE IF EXISTS {table_name} CASCADE"))
-            conn.commit()
-        
-        print(f"테이블 '{table_name}' 생성 중...")
-        
-        # 데이터를 DB에 적재
-        df.to_sql(
-            schemas,
-            table_name, 
-            engine, 
-            if_exists='replace', 
-            index=False,
-            method='multi',
-            chunksize=1000
-        )
+        conn = psycopg2.connect(**DB_CONFIG)
+        _ensure_watermark_table(conn, schemas)
+
+        file_size = os.path.getsize(csv_file_path)
+        if mode == 'incremental':
+            watermark = _get_watermark(conn, schemas, qualified)
+            if watermark is not None and watermark['byte_offset'] <= file_size:
+                file_hash, prefix_hash = _hash_file(csv_file_path, watermark['byte_offset'])
+                if prefix_hash == watermark['file_hash']:
+                    if watermark['byte_offset'] == file_size:
+                        print(f"변경 없음: '{qualified}' 는 최신 상태입니다 ({watermark['row_offset']:,} 행).")
+                    else:
+                        _append_new_rows(conn, csv_file_path, schemas, qualified, sample, watermark,
+                                         file_size, file_hash, chunk_rows, avg_row_bytes)
+                    return True
+            print("워터마크가 없거나 기존 적재 이후 파일이 변경되어 전체 적재를 수행합니다.")
+        file_hash, _ = _hash_file(csv_file_path)
+
+        # 스테이징 테이블 생성 (UNLOGGED → WAL 기록 없이 빠르게 적재)
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA IF NOT EXISTS {schemas}")
+            cur.execute(f"DROP TABLE IF EXISTS {qualified_staging}")
+            cur.execute(_create_table_sql(sample, qualified_staging, unlogged=True))
+        conn.commit()
+
+        print(f"테이블 '{qualified}' 적재 중 (COPY, workers={workers}, chunk={chunk_rows:,}행)...")
+        start = time.perf_counter()
+        loaded = 0
+        copier = _CopyWorkers(qualified_staging, workers)
+        try:
+            for chunk in _iter_csv_chunks(csv_file_path, sample, chunk_rows, avg_row_bytes):
+                copier.submit(chunk)
+                loaded += len(chunk)
+        finally:
+            copier.close()
+        elapsed = time.perf_counter() - start
+        print(f"COPY 완료: {loaded:,} 행, {elapsed:.2f}초")
+
+        # 원자적 교체: 기존 테이블 삭제 + 스테이징 테이블 이름 변경 (UNLOGGED 유지)
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {qualified} CASCADE")
+            cur.execute(f'ALTER TABLE {qualified_staging} RENAME TO "{table_name}"')
+            _set_watermark(cur, schemas, qualified, csv_file_path, file_size, loaded, file_hash)
+        conn.commit()
         
         # 테이블 정보 확인
-        with engine.connect() as conn:
-            result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-            row_count = result.fetchone()[0]
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) FROM {qualified}")
+            row_count = cur.fetchone()[0]
             
-            result = conn.execute(text(f"""
+            cur.execute("""
                 SELECT column_name, data_type, is_nullable
                 FROM information_schema.columns 
-                WHERE table_name = '{table_name}'
+                WHERE table_schema = %s AND table_name = %s
                 ORDER BY ordinal_position
-            """))
-            columns_info = result.fetchall()
+            """, (schemas, table_name))
+            columns_info = cur.fetchall()
         
         print(f"\n✅ 데이터 적재 완료!")
-        print(f"테이블: {table_name}")
+        print(f"테이블: {qualified}")
         print(f"행 수: {row_count:,}")
         print(f"컬럼 수: {len(columns_info)}")
         
@@ -86,14 +374,18 @@ def load_data_to_db(csv_file_path, schemas='ml', table_name='ml_training_data'):
         
         # 샘플 데이터 출력
         print(f"\n샘플 데이터 (처음 5행):")
-        sample_df = pd.read_sql(f"SELECT * FROM {table_name} LIMIT 5", engine)
-        print(sample_df.to_string(index=False))
+        print(sample.head(5).to_string(index=False))
         
         return True
         
     except Exception as e:
         print(f"❌ 오류 발생: {str(e)}")
+        if conn is not None:
+            conn.rollback()
         return False
+    finally:
+        if conn is not None:
+            conn.close()
 
 def create_ml_tables(engine):
     """
@@ -121,9 +413,14 @@ def create_ml_tables(engine):
                     best_params JSONB,
                     model_path VARCHAR(255),
                     report_path VARCHAR(255),
+                    manifest_path VARCHAR(255),
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """))
+            # 실행별 아티팩트 매니페스트 경로 (기존 테이블 호환)
+            conn.execute(text("""
+                ALTER TABLE ml.ml_model_performance ADD COLUMN IF NOT EXISTS manifest_path VARCHAR(255)
+            """))
             
             # 예측 결과 테이블
             conn.execute(text("""
@@ -138,6 +435,65 @@ def create_ml_tables(engine):
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_ml_predictions_customer_date
+                ON ml.ml_predictions (customer_id, prediction_date)
+            """))
+            # upsert 키 (이전 실행의 중복 행은 최신 행만 남김)
+            if conn.execute(text("SELECT to_regclass('ml.uq_ml_predictions_customer_version')")).scalar() is None:
+                conn.execute(text("""
+                    DELETE FROM ml.ml_predictions a
+                    USING ml.ml_predictions b
+                    WHERE a.customer_id = b.customer_id
+                    AND a.model_version IS NOT DISTINCT FROM b.model_version
+                    AND a.id < b.id
+                """))
+            conn.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_ml_predictions_customer_version
+                ON ml.ml_predictions (customer_id, model_version)
+            """))
+            
+            # 고객별 상위 N개 SHAP 기여 피처 (batch_score.py --explain_top_n)
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS ml.ml_prediction_explanations (
+                    customer_id VARCHAR(100) NOT NULL,
+                    model_version VARCHAR(50) NOT NULL,
+                    base_value REAL,
+                    top_features TEXT[],
+                    contributions REAL[],
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (customer_id, model_version)
+                )
+            """))
+            
+            # 증분 스코어링 워터마크 (customers.customer_changes.id 기준)
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS ml.ml_scoring_watermarks (
+                    job_name VARCHAR(100) PRIMARY KEY,
+                    last_change_id BIGINT NOT NULL,
+                    model_version VARCHAR(50),
+                    scored_rows INTEGER,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
+            
+            # 섀도 스코어링 비교 결과 (백엔드 /api/predict 배치 단위)
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS ml.ml_shadow_scores (
+                    id SERIAL PRIMARY KEY,
+                    prod_version VARCHAR(50),
+                    shadow_version VARCHAR(50),
+                    batch_size INTEGER,
+                    mean_abs_delta DECIMAL(8,6),
+                    max_abs_delta DECIMAL(8,6),
+                    mean_delta DECIMAL(8,6),
+                    agreement_rate DECIMAL(6,4),
+                    threshold DECIMAL(4,3),
+                    prod_latency_ms DECIMAL(10,3),
+                    shadow_latency_ms DECIMAL(10,3),
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
             
             conn.commit()
             print("✅ 머신러닝 관련 테이블 생성 완료")
@@ -156,18 +512,14 @@ def main():
     print(f"시작 시간: {datetime.now()}")
     
     # 데이터 적재
-    success = load_data_to_db(csv_file, 'ml_training_data')
+    workers = int(os.getenv("ML_LOAD_WORKERS", "4"))
+    chunk_rows = int(os.getenv("ML_LOAD_CHUNK_ROWS", "100000"))
+    mode = os.getenv("ML_LOAD_MODE", "incremental")
+    success = load_data_to_db(csv_file, table_name='ml_training_data', workers=workers,
+                              chunk_rows=chunk_rows, mode=mode)
     
     if success:
         # 머신러닝 관련 테이블 생성
-        DB_CONFIG = {
-            'host': 'postgres',
-            'port': 5432,
-            'database': 'retention_db',
-            'user': 'retention_user',
-            'password': 'retention_password'
-        }
-        
         engine = create_engine(
             f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
         )
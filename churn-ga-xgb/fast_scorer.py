@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+학습된 파이프라인(model_pipeline.joblib)용 경량 고속 스코어러
+-----------------------------------------------------------------
+- 학습된 ColumnTransformer(중앙값 대치 + 표준화 / 최빈값 대치 + 원-핫)를
+  NumPy 배열(중앙값, 평균/스케일, 범주→인덱스 맵)로 컴파일
+- XGBoost Booster 원본(raw)과 함께 하나의 가벼운 아티팩트로 저장
+- 예측은 fused NumPy 변환 + Booster.inplace_predict 로 수행해
+  sklearn/pandas 프레임워크 오버헤드 없이 소규모 배치를 빠르게 스코어링
+
+사용법 예시:
+>>> scorer = load_fast_scorer('outputs/fast_scorer.joblib')
+>>> proba = scorer.predict_proba(df)
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import xgboost as xgb
+
+FAST_SCORER_VERSION = 1
+
+
+def compile_pipeline(pipeline):
+    """
+    학습된 Pipeline(pre + clf)을 순수 NumPy/바이트 아티팩트(dict)로 컴파일
+    """
+    pre = pipeline.named_steps['pre']
+    clf = pipeline.named_steps['clf']
+
+    artifact = {
+        'version': FAST_SCORER_VERSION,
+        'num_cols': [], 'num_fill': np.zeros(0), 'num_mean': np.zeros(0), 'num_scale': np.ones(0),
+        'cat_cols': [], 'cat_fill': [], 'cat_categories': [],
+    }
+    for name, trans, cols in pre.transformers_:
+        if name not in ('num', 'cat') or len(cols) == 0:
+            continue
+        if name == 'num':
+            imputer = trans.named_steps['imputer']
+            scaler = trans.named_steps['scaler']
+            n = len(cols)
+            artifact['num_cols'] = list(cols)
+            artifact['num_fill'] = np.asarray(imputer.statistics_, dtype=np.float64)
+            artifact['num_mean'] = np.asarray(scaler.mean_ if scaler.mean_ is not None else np.zeros(n), dtype=np.float64)
+            artifact['num_scale'] = np.asarray(scaler.scale_ if scaler.scale_ is not None else np.ones(n), dtype=np.float64)
+        else:
+            imputer = trans.named_steps['imputer']
+            ohe = trans.named_steps['ohe']
+            artifact['cat_cols'] = list(cols)
+            artifact['cat_fill'] = list(imputer.statistics_)
+            artifact['cat_categories'] = [np.asarray(c) for c in ohe.categories_]
+
+    booster = clf.get_booster()
+    artifact['booster_raw'] = bytes(booster.save_raw(raw_format='ubj'))
+    artifact['n_features'] = len(artifact['num_cols']) + int(sum(len(c) for c in artifact['cat_categories']))
+    return artifact
+
+
+class FastScorer:
+    """컴파일된 아티팩트로 확률을 계산하는 스코어러"""
+
+    def __init__(self, artifact):
+        self.artifact = artifact
+        self.num_cols = artifact['num_cols']
+        self.cat_cols = artifact['cat_cols']
+        self.n_features = artifact['n_features']
+        self._num_fill = artifact['num_fill']
+        # 표준화를 x * inv_scale + offset 한 번의 FMA 형태로 결합
+        self._inv_scale = 1.0 / artifact['num_scale']
+        self._offset = -artifact['num_mean'] * self._inv_scale
+        self._cat_fill = artifact['cat_fill']
+        self._cat_categories = [pd.Index(c) for c in artifact['cat_categories']]
+        self._cat_offsets = np.cumsum([len(self.num_cols)] + [len(c) for c in self._cat_categories])[:-1]
+        self.booster = xgb.Booster()
+        self.booster.load_model(bytearray(artifact['booster_raw']))
+
+    def transform(self, df):
+        """ColumnTransformer.transform 과 동일한 float32 행렬 생성"""
+        n = len(df)
+        out = np.zeros((n, self.n_features), dtype=np.float32)
+
+        if self.num_cols:
+            Xn = df[self.num_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+            mask = np.isnan(Xn)
+            if mask.any():
+                Xn = np.where(mask, self._num_fill, Xn)
+            out[:, :len(self.num_cols)] = Xn * self._inv_scale + self._offset
+
+        rows = np.arange(n)
+        for col, fill, cats, offset in zip(self.cat_cols, self._cat_fill, self._cat_categories, self._cat_offsets):
+            values = df[col]
+            if values.isna().any():
+                values = values.fillna(fill)
+            codes = cats.get_indexer(values)
+            # handle_unknown='ignore' 와 동일하게 미지 범주는 전부 0
+            known = codes >= 0
+            out[rows[known], offset + codes[known]] = 1.0
+        return out
+
+    def predict_proba(self, df):
+        """양성 클래스(1) 확률 반환"""
+        X = self.transform(df)
+        return self.booster.inplace_predict(X, predict_type='value')
+
+
+def export_fast_scorer(pipeline, path, X_check=None, tol=1e-5):
+    """
+    파이프라인을 컴파일해 저장하고, X_check가 주어지면 원본 파이프라인과의 최대 오차를 반환
+    """
+    artifact = compile_pipeline(pipeline)
+    joblib.dump(artifact, path)
+    max_abs_diff = None
+    if X_check is not None and len(X_check) > 0:
+        scorer = FastScorer(artifact)
+        ref = pipeline.predict_proba(X_check)[:, 1]
+        fast = scorer.predict_proba(X_check)
+        max_abs_diff = float(np.max(np.abs(ref - fast)))
+        if max_abs_diff > tol:
+            print(f"⚠️ 고속 스코어러 오차가 허용치를 초과합니다: {max_abs_diff:.2e} > {tol:.0e}")
+    return path, max_abs_diff
+
+
+def load_fast_scorer(path):
+    """저장된 고속 스코어러 아티팩트 로드"""
+    artifact = joblib.load(path)
+    if artifact.get('version') != FAST_SCORER_VERSION:
+        raise ValueError(f"지원하지 않는 고속 스코어러 버전: {artifact.get('version')}")
+    return FastScorer(artifact)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+병렬 순열 중요도(Permutation Importance)
+-----------------------------------------------------------------
+- 전처리된 테스트 행렬을 열 우선(Fortran) 순서의 메모리 맵 .npy 로 한 번만 저장, 워커는 복사 없이 연결
+- 기준 예측/점수는 한 번만 계산
+- 원-핫 컬럼은 원본 피처 단위 그룹으로 함께 순열 → 원본 피처명 기준 중요도 (feature_groups)
+- 워커는 copy-on-write 맵에서 그룹 컬럼만 저장 → 섞어서 예측 → 복원
+  (열 우선 저장이라 실제로 복사되는 페이지는 건드린 컬럼뿐, 공유 파일은 읽기 전용으로 유지)
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score
+
+import xgboost as xgb
+
+# 워커 프로세스 전역 상태 (initializer에서 설정)
+_X = None
+_Y = None
+_BOOSTER = None
+_BASE_SCORE = None
+
+
+def _init_worker(x_path, y, booster_raw, base_score, nthread):
+    global _X, _Y, _BOOSTER, _BASE_SCORE
+    # 'c'(copy-on-write): 쓰기는 프로세스 전용 페이지로만 반영되고 파일/다른 워커에는 영향 없음
+    _X = np.load(x_path, mmap_mode='c')
+    _Y = y
+    _BOOSTER = xgb.Booster()
+    _BOOSTER.load_model(bytearray(booster_raw))
+    _BOOSTER.set_param({'nthread': nthread})
+    _BASE_SCORE = base_score
+
+
+def _permute_group(cols, n_repeats, seed):
+    """그룹 컬럼을 같은 행 순열로 섞었을 때의 점수 하락 (n_repeats 회)"""
+    rng = np.random.RandomState(seed)
+    saved = np.array(_X[:, cols])
+    drops = []
+    try:
+        for _ in range(n_repeats):
+            _X[:, cols] = saved[rng.permutation(len(saved))]
+            proba = _BOOSTER.inplace_predict(_X, predict_type='value')
+            drops.append(_BASE_SCORE - average_precision_score(_Y, proba))
+    finally:
+        _X[:, cols] = saved
+    return float(np.mean(drops)), float(np.std(drops))
+
+
+def feature_groups(pre):
+    """
+    ColumnTransformer 출력 컬럼 → 원본 피처 매핑
+    Returns:
+        [(원본 피처명, [출력 컬럼 인덱스...]), ...]
+    """
+    groups, offset = [], 0
+    for name, trans, cols in pre.transformers_:
+        if name not in ('num', 'cat') or len(cols) == 0:
+            continue
+        if name == 'num':
+            for c in cols:
+                groups.append((c, [offset]))
+                offset += 1
+        else:
+            for c, cats in zip(cols, trans.named_steps['ohe'].categories_):
+                groups.append((c, list(range(offset, offset + len(cats)))))
+                offset += len(cats)
+    return groups
+
+
+def permutation_importance(booster, X_trans, y, groups, n_repeats=3, workers=0, random_state=42, tmp_dir=None):
+    """
+    원본 피처 그룹 단위 순열 중요도 (PR-AUC 하락량)
+
+    Args:
+        booster: 학습된 xgboost.Booster
+        X_trans: 전처리 완료 행렬
+        y: 정답 레이블
+        groups: [(원본 피처명, [출력 컬럼 인덱스...]), ...]
+        workers: 워커 프로세스 수 (0이면 CPU 수)
+    Returns:
+        DataFrame[feature, importance_mean, importance_std] (중요도 내림차순)
+    """
+    X_trans = np.ascontiguousarray(X_trans, dtype=np.float32)
+    y = np.asarray(y)
+    base_score = float(average_precision_score(y, booster.inplace_predict(X_trans, predict_type='value')))
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(groups)))
+
+    root = tempfile.mkdtemp(prefix='perm_imp_', dir=tmp_dir)
+    try:
+        x_path = os.path.join(root, 'X.npy')
+        # 열 우선 순서로 직접 기록 (메모리에 사본을 만들지 않음)
+        X_map = np.lib.format.open_memmap(x_path, mode='w+', dtype=np.float32, shape=X_trans.shape,
+                                          fortran_order=True)
+        X_map[:] = X_trans
+        X_map.flush()
+        del X_map
+        booster_raw = bytes(booster.save_raw(raw_format='ubj'))
+        nthread = max(1, (os.cpu_count() or 1) // workers)
+        # 스레드(리포트 작업)에서 호출될 수 있으므로 fork 대신 spawn
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(x_path, y, booster_raw, base_score, nthread)) as ex:
+            futures = [ex.submit(_permute_group, cols, n_repeats, random_state + i)
+                       for i, (_, cols) in enumerate(groups)]
+            results = [f.result() for f in futures]
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    df = pd.DataFrame(
+        [(name, m, s) for (name, _), (m, s) in zip(groups, results)],
+        columns=['feature', 'importance_mean', 'importance_std'])
+    return df.sort_values('importance_mean', ascending=False).reset_index(drop=True)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GA 병렬 평가용 공유 폴드 데이터
+-----------------------------------------------------------------
+- 교차검증 폴드별로 전처리(fit/transform)를 한 번만 수행하고
+  결과 행렬을 메모리 맵 .npy 파일로 저장
+- 워커 프로세스는 np.load(mmap_mode='r')로 복사 없이 연결(attach)
+  → 워커 수가 늘어도 메모리 사용량이 일정, 작업 제출 시 X/y 피클링 없음
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import average_precision_score, precision_score, recall_score
+from sklearn.model_selection import StratifiedKFold
+from xgboost import XGBClassifier
+
+
+class FoldStore:
+    """디스크(메모리 맵)에 저장된 전처리 완료 폴드 행렬 핸들 (피클 시 경로만 전달)"""
+
+    def __init__(self, root, n_folds):
+        self.root = root
+        self.n_folds = n_folds
+
+    @classmethod
+    def build(cls, X, y, preprocessor, kfold=5, random_state=42, root=None):
+        """폴드별 전처리 결과를 float32 .npy 파일로 저장"""
+        root = tempfile.mkdtemp(prefix='ga_folds_', dir=root)
+        skf = StratifiedKFold(n_splits=kfold, shuffle=True, random_state=random_state)
+        y_arr = np.asarray(y)
+        for i, (tr_idx, va_idx) in enumerate(skf.split(X, y_arr)):
+            pre = clone(preprocessor)
+            Xtr = pre.fit_transform(X.iloc[tr_idx])
+            Xva = pre.transform(X.iloc[va_idx])
+            np.save(os.path.join(root, f'fold{i}_Xtr.npy'), np.asarray(Xtr, dtype=np.float32))
+            np.save(os.path.join(root, f'fold{i}_Xva.npy'), np.asarray(Xva, dtype=np.float32))
+            np.save(os.path.join(root, f'fold{i}_ytr.npy'), y_arr[tr_idx])
+            np.save(os.path.join(root, f'fold{i}_yva.npy'), y_arr[va_idx])
+        return cls(root, kfold)
+
+    def attach(self):
+        """폴드별 (Xtr, Xva, ytr, yva) 메모리 맵 배열 목록 반환 (복사 없음)"""
+        folds = []
+        for i in range(self.n_folds):
+            folds.append(tuple(
+                np.load(os.path.join(self.root, f'fold{i}_{name}.npy'), mmap_mode='r')
+                for name in ('Xtr', 'Xva', 'ytr', 'yva')))
+        return folds
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+# 워커 프로세스 전역: initializer에서 한 번만 attach
+_FOLDS = None
+
+
+def init_worker(store):
+    global _FOLDS
+    _FOLDS = store.attach()
+
+
+def eval_candidate(params, scoring='pr_auc', threads=1, random_state=42):
+    """
+    워커에서 공유 폴드로 후보 파라미터 평가 (eval_params 와 동일한 지표)
+
+    Returns:
+        (score, mean PR-AUC, mean F1)
+    """
+    pr_aucs, f1s = [], []
+    for Xtr, Xva, ytr, yva in _FOLDS:
+        pos = (ytr == 1).sum()
+        spw = float((ytr == 0).sum()) / float(pos) if pos else 1.0
+        clf = XGBClassifier(
+            objective='binary:logistic',
+            eval_metric='logloss',
+            tree_method='hist',
+            random_state=random_state,
+            n_jobs=threads,
+            **params,
+            scale_pos_weight=spw
+        )
+        clf.fit(Xtr, ytr)
+        proba = clf.predict_proba(Xva)[:, 1]
+        pr_aucs.append(average_precision_score(yva, proba))
+        pred = (proba >= 0.5).astype(int)
+        prec = precision_score(yva, pred, zero_division=0)
+        rec = recall_score(yva, pred, zero_division=0)
+        f1s.append(2 * prec * rec / max(1e-9, prec + rec))
+    score = np.mean(pr_aucs) if scoring == 'pr_auc' else np.mean(f1s)
+    return score, np.mean(pr_aucs), np.mean(f1s)
@@ -10,6 +10,89 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def create_change_tracking(cursor):
+    """고객/대출/상환 변경 시 영향받는 customer_id 를 customers.customer_changes 에 기록 (증분 스코어링용)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS customers.customer_changes (
+            id BIGSERIAL PRIMARY KEY,
+            customer_id VARCHAR(20) NOT NULL,
+            source_table VARCHAR(30) NOT NULL,
+            operation VARCHAR(10) NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            txid BIGINT NOT NULL DEFAULT txid_current()
+        )
+    """)
+    # 기록한 트랜잭션 id: id(BIGSERIAL)는 커밋 순서가 아니므로 스코어링 워터마크는 txid 와
+    # txid_snapshot_xmin(진행 중인 가장 오래된 트랜잭션) 기준으로 잡음
+    cursor.execute("ALTER TABLE customers.customer_changes ADD COLUMN IF NOT EXISTS txid BIGINT NOT NULL DEFAULT txid_current()")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_customer_changes_txid ON customers.customer_changes (txid)")
+    
+    # customers / loans: 행에 customer_id 가 있음
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION customers.log_customer_change()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                IF OLD.customer_id IS NOT NULL THEN
+                    INSERT INTO customers.customer_changes (customer_id, source_table, operation)
+                    VALUES (OLD.customer_id, TG_TABLE_NAME, TG_OP);
+                END IF;
+                RETURN OLD;
+            END IF;
+            -- 다른 고객으로 옮겨진 행은 이전 고객도 재스코어링 대상
+            IF TG_OP = 'UPDATE' THEN
+                IF OLD.customer_id IS NOT NULL AND OLD.customer_id IS DISTINCT FROM NEW.customer_id THEN
+                    INSERT INTO customers.customer_changes (customer_id, source_table, operation)
+                    VALUES (OLD.customer_id, TG_TABLE_NAME, TG_OP);
+                END IF;
+            END IF;
+            IF NEW.customer_id IS NOT NULL THEN
+                INSERT INTO customers.customer_changes (customer_id, source_table, operation)
+                VALUES (NEW.customer_id, TG_TABLE_NAME, TG_OP);
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    
+    # repayments: loan_id → loans.customer_id
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION customers.log_repayment_change()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            v_old_loan_id VARCHAR(20);
+            v_new_loan_id VARCHAR(20);
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                v_old_loan_id := OLD.loan_id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                v_new_loan_id := NEW.loan_id;
+            END IF;
+            -- 다른 대출로 옮겨진 상환 기록은 이전 대출의 고객도 기록
+            INSERT INTO customers.customer_changes (customer_id, source_table, operation)
+            SELECT DISTINCT l.customer_id, TG_TABLE_NAME, TG_OP
+            FROM customers.loans l
+            WHERE l.loan_id IN (v_old_loan_id, v_new_loan_id) AND l.customer_id IS NOT NULL;
+            IF TG_OP = 'DELETE' THEN
+                RETURN OLD;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    
+    for table, func in (('customers', 'log_customer_change'),
+                        ('loans', 'log_customer_change'),
+                        ('repayments', 'log_repayment_change')):
+        cursor.execute(f"DROP TRIGGER IF EXISTS track_{table}_changes ON customers.{table}")
+        cursor.execute(f"""
+            CREATE TRIGGER track_{table}_changes
+            AFTER INSERT OR UPDATE OR DELETE ON customers.{table}
+            FOR EACH ROW EXECUTE FUNCTION customers.{func}()
+        """)
+    logger.info("customers 변경 추적 트리거가 생성되었습니다.")
+
 def create_customers_schema():
     """customers 스키마 및 테이블 생성"""
     
@@ -90,6 +173,8 @@ def create_customers_schema():
             """)
             logger.info("customers.repayments 테이블이 생성되었습니다.")
             
+            create_change_tracking(cursor)
+            
             conn.commit()
             logger.info("모든 테이블이 성공적으로 생성되었습니다.")
             
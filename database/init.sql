@@ -120,6 +120,110 @@ CREATE TRIGGER update_applications_updated_at BEFORE UPDATE ON refinance_applica
 CREATE TRIGGER update_products_updated_at BEFORE UPDATE ON refinance_products
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- 대시보드 카운터 (단일 행, 트리거로 유지 → /api/dashboard 는 PK 조회 1회)
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    customer_count BIGINT NOT NULL DEFAULT 0,
+    loan_count BIGINT NOT NULL DEFAULT 0,
+    refinance_count BIGINT NOT NULL DEFAULT 0,
+    product_count BIGINT NOT NULL DEFAULT 0,
+    total_loan_amount DECIMAL(20,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 전체 재계산 (초기화 / TRUNCATE 후 / 불일치 보정용)
+CREATE OR REPLACE FUNCTION refresh_dashboard_counters()
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO dashboard_counters (id, customer_count, loan_count, refinance_count, product_count, total_loan_amount, updated_at)
+    VALUES (
+        1,
+        (SELECT COUNT(*) FROM customers),
+        (SELECT COUNT(*) FROM loans),
+        (SELECT COUNT(*) FROM refinance_applications),
+        (SELECT COUNT(*) FROM refinance_products WHERE is_active = TRUE),
+        (SELECT COALESCE(SUM(loan_amount), 0) FROM loans),
+        CURRENT_TIMESTAMP
+    )
+    ON CONFLICT (id) DO UPDATE SET
+        customer_count = EXCLUDED.customer_count,
+        loan_count = EXCLUDED.loan_count,
+        refinance_count = EXCLUDED.refinance_count,
+        product_count = EXCLUDED.product_count,
+        total_loan_amount = EXCLUDED.total_loan_amount,
+        updated_at = EXCLUDED.updated_at;
+END;
+$$ language 'plpgsql';
+
+-- 행 변경분만큼 카운터 증감
+CREATE OR REPLACE FUNCTION update_dashboard_counters()
+RETURNS TRIGGER AS $$
+DECLARE
+    d_count BIGINT := 0;
+    d_amount DECIMAL(20,2) := 0;
+BEGIN
+    IF TG_TABLE_NAME = 'refinance_products' THEN
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_active THEN d_count := d_count + 1; END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') AND OLD.is_active THEN d_count := d_count - 1; END IF;
+    ELSIF TG_OP = 'INSERT' THEN
+        d_count := 1;
+    ELSIF TG_OP = 'DELETE' THEN
+        d_count := -1;
+    END IF;
+
+    IF TG_TABLE_NAME = 'loans' THEN
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN d_amount := d_amount + COALESCE(NEW.loan_amount, 0); END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN d_amount := d_amount - COALESCE(OLD.loan_amount, 0); END IF;
+    END IF;
+
+    IF d_count <> 0 OR d_amount <> 0 THEN
+        UPDATE dashboard_counters SET
+            customer_count = customer_count + CASE WHEN TG_TABLE_NAME = 'customers' THEN d_count ELSE 0 END,
+            loan_count = loan_count + CASE WHEN TG_TABLE_NAME = 'loans' THEN d_count ELSE 0 END,
+            refinance_count = refinance_count + CASE WHEN TG_TABLE_NAME = 'refinance_applications' THEN d_count ELSE 0 END,
+            product_count = product_count + CASE WHEN TG_TABLE_NAME = 'refinance_products' THEN d_count ELSE 0 END,
+            total_loan_amount = total_loan_amount + d_amount,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION truncate_dashboard_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_dashboard_counters();
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER customers_dashboard_counters AFTER INSERT OR DELETE ON customers
+    FOR EACH ROW EXECUTE FUNCTION update_dashboard_counters();
+
+CREATE TRIGGER loans_dashboard_counters AFTER INSERT OR DELETE OR UPDATE OF loan_amount ON loans
+    FOR EACH ROW EXECUTE FUNCTION update_dashboard_counters();
+
+CREATE TRIGGER applications_dashboard_counters AFTER INSERT OR DELETE ON refinance_applications
+    FOR EACH ROW EXECUTE FUNCTION update_dashboard_counters();
+
+CREATE TRIGGER products_dashboard_counters AFTER INSERT OR DELETE OR UPDATE OF is_active ON refinance_products
+    FOR EACH ROW EXECUTE FUNCTION update_dashboard_counters();
+
+CREATE TRIGGER customers_dashboard_truncate AFTER TRUNCATE ON customers
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_dashboard_counters();
+
+CREATE TRIGGER loans_dashboard_truncate AFTER TRUNCATE ON loans
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_dashboard_counters();
+
+CREATE TRIGGER applications_dashboard_truncate AFTER TRUNCATE ON refinance_applications
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_dashboard_counters();
+
+CREATE TRIGGER products_dashboard_truncate AFTER TRUNCATE ON refinance_products
+    FOR EACH STATEMENT EXECUTE FUNCTION truncate_dashboard_counters();
+
+SELECT refresh_dashboard_counters();
+
 -- 샘플 데이터 삽입
 INSERT INTO customers (customer_id, name, phone, email, birth_date, address) VALUES
 ('CUST001', '홍길동', '01012345678', 'hong@example.com', '1990-01-01', '서울시 강남구'),